@@ -0,0 +1,329 @@
+import asyncio, fcntl, glob, os, uuid
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Article
+from .embeddings import loads_embedding
+from .vector_store import embedding_store, load_embedding_matrix
+
+# "exact" scans EmbeddingStore; "ivf" uses the persistent IVFIndex below
+EMBEDDING_INDEX = os.getenv("EMBEDDING_INDEX", "exact")
+ANN_INDEX_PATH = os.getenv("ANN_INDEX_PATH", "db/ann_index.npz")
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    return x / (np.linalg.norm(x, axis=-1, keepdims=True) + 1e-9)
+
+def _assign(vecs: np.ndarray, centroids: np.ndarray, chunk: int = 16384) -> np.ndarray:
+    out = np.empty(len(vecs), dtype=np.int64)
+    for start in range(0, len(vecs), chunk):
+        out[start:start + chunk] = np.argmax(vecs[start:start + chunk] @ centroids.T, axis=1)
+    return out
+
+def train_centroids(vecs: np.ndarray, nlist: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on (a sample of) normalized vectors."""
+    rng = np.random.default_rng(seed)
+    sample = vecs if len(vecs) <= nlist * 64 else vecs[rng.choice(len(vecs), nlist * 64, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iters):
+        labels = _assign(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=nlist)
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(sample[order], (np.cumsum(counts) - counts)[nonempty], axis=0)
+        empty = counts == 0
+        # Re-seed empty lists with random points so every list stays useful
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+def default_nlist(n: int) -> int:
+    # ~4*sqrt(N) lists; tiny corpora get a single list, i.e. exact search
+    return 1 if n < 2000 else int(4 * np.sqrt(n))
+
+class IVFIndex:
+    """Inverted-file ANN index over normalized embeddings, persisted next to the DB.
+
+    Vectors are bucketed by their nearest k-means centroid; a query scans only
+    the ``nprobe`` closest buckets. New rows are appended to their bucket and
+    written as small delta files, which are folded into the base file (and the
+    centroids retrained once the index has grown 4x) by ``compact``. While serving,
+    the file work runs in a thread (see ``add_articles``).
+    """
+
+    max_deltas = 32
+
+    def __init__(self, path: str = ANN_INDEX_PATH, nprobe: int = ANN_NPROBE):
+        self.path = path
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_on = 0
+        self._list_ids: List[np.ndarray] = []
+        self._list_vecs: List[np.ndarray] = []
+        self._known = set()
+        self._deltas = 0
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+        self._persist_lock = asyncio.Lock()
+        # Rows added while a compaction works on a snapshot, put back once it is swapped in
+        self._unsaved: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._known)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self.centroids is None else self.centroids.shape[1]
+
+    def build(self, ids: np.ndarray, vecs: np.ndarray, nlist: Optional[int] = None):
+        vecs = _normalize(vecs)
+        nlist = min(nlist or default_nlist(len(vecs)), max(len(vecs), 1))
+        self.centroids = train_centroids(vecs, nlist) if len(vecs) else None
+        self.trained_on = len(vecs)
+        self._list_ids = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._list_vecs = [np.zeros((0, vecs.shape[1]), dtype=np.float32) for _ in range(nlist)]
+        self._known = set()
+        self._insert(np.asarray(ids, dtype=np.int64), vecs)
+
+    def _insert(self, ids: np.ndarray, vecs: np.ndarray):
+        if not len(ids) or self.centroids is None:
+            return
+        labels = _assign(vecs, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        lists, starts = np.unique(labels[order], return_index=True)
+        for c, group in zip(lists, np.split(order, starts[1:])):
+            self._list_ids[c] = np.concatenate([self._list_ids[c], ids[group]])
+            self._list_vecs[c] = np.concatenate([self._list_vecs[c], vecs[group]])
+        self._known.update(ids.tolist())
+
+    def add(self, ids: Sequence[int], vecs: Iterable[Sequence[float]],
+            persist: bool = True) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Insert unseen rows; returns the (ids, normalized vectors) inserted, if any."""
+        rows = [(i, np.asarray(v, dtype=np.float32)) for i, v in zip(ids, vecs) if i not in self._known and len(v)]
+        if self.dim is not None:
+            rows = [(i, v) for i, v in rows if len(v) == self.dim]
+        if not rows:
+            return None
+        new_ids = np.array([i for i, _ in rows], dtype=np.int64)
+        new_vecs = _normalize(np.stack([v for _, v in rows]))
+        if self.centroids is None:
+            # First rows ever seen: train on them and write a base file
+            self.build(new_ids, new_vecs)
+            if persist:
+                self.compact()
+            return new_ids, new_vecs
+        self._insert(new_ids, new_vecs)
+        if self._unsaved is not None:
+            self._unsaved.append((new_ids, new_vecs))
+        if persist:
+            self._write_delta(new_ids, new_vecs)
+        return new_ids, new_vecs
+
+    def search(self, query: Sequence[float], k: int = 10, nprobe: Optional[int] = None,
+               among: Optional[np.ndarray] = None) -> Tuple[List[int], List[float]]:
+        if self.centroids is None or not self.size or k <= 0:
+            return [], []
+        q = _normalize(query)
+        if q.shape != (self.dim,):
+            return [], []
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        if among is None:
+            probe = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+            ids = np.concatenate([self._list_ids[c] for c in probe])
+            sims = np.concatenate([self._list_vecs[c] @ q for c in probe])
+        else:
+            # Only some rows qualify, so keep doubling the lists probed until k of them turn up
+            order = np.argsort(-(self.centroids @ q))
+            ids, sims, done = [], [], 0
+            while True:
+                for c in order[done:nprobe]:
+                    rows = np.flatnonzero(np.isin(self._list_ids[c], among))
+                    ids.append(self._list_ids[c][rows])
+                    sims.append(self._list_vecs[c][rows] @ q)
+                done = nprobe
+                if sum(map(len, ids)) >= k or nprobe == len(order):
+                    break
+                nprobe = min(nprobe * 2, len(order))
+            ids, sims = np.concatenate(ids), np.concatenate(sims)
+        if not len(ids):
+            return [], []
+        k = min(k, len(ids))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return ids[top].tolist(), sims[top].tolist()
+
+    # --- persistence -------------------------------------------------------
+
+    def _delta_paths(self) -> List[str]:
+        return sorted(glob.glob(f"{self.path}.delta-*.npz"))
+
+    @contextmanager
+    def _file_lock(self, mode: int, blocking: bool = True):
+        # Several workers share the files: compact (LOCK_EX) must not interleave with
+        # another compact or with a load (LOCK_SH) between its base rewrite and delta cleanup.
+        # Yields whether the lock is held (always, unless not ``blocking``)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".lock", "w") as lock:
+            try:
+                fcntl.flock(lock, mode if blocking else mode | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _save(path: str, **arrays):
+        # Written under a unique name and renamed, so readers never see half a file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    def _write_delta(self, ids: np.ndarray, vecs: np.ndarray):
+        if self._deltas >= self.max_deltas:
+            self.compact()
+            return
+        self._deltas += 1
+        self._save_delta(ids, vecs)
+
+    def _save_delta(self, ids: np.ndarray, vecs: np.ndarray):
+        # Unique per writer: other workers write deltas next to ours
+        self._save(f"{self.path}.delta-{os.getpid()}-{uuid.uuid4().hex[:12]}.npz", ids=ids, vecs=vecs)
+
+    def _merge(self, path: str):
+        # Rows another worker persisted that this one hasn't seen
+        with np.load(path) as data:
+            ids, vecs = data["ids"], data["vecs"]
+        if len(ids) and vecs.shape[1] == self.dim:
+            new = np.array([i not in self._known for i in ids.tolist()], dtype=bool)
+            self._insert(ids[new], vecs[new])
+
+    def compact(self, blocking: bool = True) -> bool:
+        """Rewrite the base file with every row, retraining centroids if the index has outgrown them.
+
+        Rows other workers have persisted since this one loaded (their base rewrite or deltas)
+        are merged in first, and only the delta files folded into the new base are removed.
+        Unless ``blocking``, returns False right away if another worker is compacting.
+        """
+        if self.centroids is None:
+            return True
+        with self._file_lock(fcntl.LOCK_EX, blocking) as held:
+            if not held:
+                return False
+            folded = self._delta_paths()
+            for p in ([self.path] if os.path.exists(self.path) else []) + folded:
+                self._merge(p)
+            ids = np.concatenate(self._list_ids) if self._list_ids else np.zeros(0, dtype=np.int64)
+            vecs = np.concatenate(self._list_vecs) if self._list_vecs else np.zeros((0, 0), dtype=np.float32)
+            if len(ids) >= 4 * max(self.trained_on, 1) and default_nlist(len(ids)) != len(self._list_ids):
+                self.build(ids, vecs)
+            self._save(
+                self.path, centroids=self.centroids, trained_on=self.trained_on,
+                sizes=np.array([len(x) for x in self._list_ids], dtype=np.int64),
+                ids=np.concatenate(self._list_ids), vecs=np.concatenate(self._list_vecs),
+            )
+            for p in folded:
+                os.remove(p)
+        self._deltas = 0
+        return True
+
+    def _compacted(self, centroids: np.ndarray, trained_on: int, list_ids: List[np.ndarray],
+                   list_vecs: List[np.ndarray]) -> Optional["IVFIndex"]:
+        # compact() on a copy of a snapshot, for a thread: the live index keeps serving meanwhile
+        scratch = IVFIndex(self.path, self.nprobe)
+        scratch.centroids, scratch.trained_on = centroids, trained_on
+        scratch._list_ids, scratch._list_vecs = list_ids, list_vecs
+        scratch._known = set(np.concatenate(list_ids).tolist()) if list_ids else set()
+        return scratch if scratch.compact(blocking=False) else None
+
+    async def _persist(self, ids: np.ndarray, vecs: np.ndarray):
+        # Rows just inserted in memory go to disk from a thread: a small delta file, or every
+        # max_deltas adds the compaction (full rewrite, maybe retraining) of the whole index
+        if self._deltas < self.max_deltas and os.path.exists(self.path):
+            self._deltas += 1
+            await asyncio.to_thread(self._save_delta, ids, vecs)
+            return
+        self._unsaved = []
+        try:
+            scratch = await asyncio.to_thread(self._compacted, self.centroids, self.trained_on,
+                                              list(self._list_ids), list(self._list_vecs))
+            unsaved = self._unsaved
+        finally:
+            self._unsaved = None
+        if scratch is None:
+            # Another worker is compacting (and folds in whatever it finds); save these rows as
+            # a delta and try again on the next add
+            await asyncio.to_thread(self._save_delta, ids, vecs)
+            return
+        self.centroids, self.trained_on = scratch.centroids, scratch.trained_on
+        self._list_ids, self._list_vecs, self._known = scratch._list_ids, scratch._list_vecs, scratch._known
+        self._deltas = 0
+        for new_ids, new_vecs in unsaved:
+            keep = np.array([i not in self._known for i in new_ids.tolist()], dtype=bool)
+            self._insert(new_ids[keep], new_vecs[keep])
+
+    def load(self) -> bool:
+        with self._file_lock(fcntl.LOCK_SH):
+            if not os.path.exists(self.path):
+                return False
+            with np.load(self.path) as data:
+                self.centroids = data["centroids"]
+                self.trained_on = int(data["trained_on"])
+                bounds = np.cumsum(data["sizes"])[:-1]
+                self._list_ids = np.split(data["ids"], bounds)
+                self._list_vecs = np.split(data["vecs"], bounds)
+            self._known = set(np.concatenate(self._list_ids).tolist())
+            for p in self._delta_paths():
+                self._merge(p)
+        return True
+
+    # --- same interface as EmbeddingStore --------------------------------
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if not self.loaded:
+                await self._load_or_build(session)
+
+    async def _load_or_build(self, session: AsyncSession):
+        # Reading the files (under a shared lock), training and rewriting them run in a thread;
+        # nothing searches or adds to the index before it is loaded
+        if not await asyncio.to_thread(self.load):
+            ids, vecs = await load_embedding_matrix(session)
+            await asyncio.to_thread(self.build, ids, vecs)
+            await asyncio.to_thread(self.compact)
+        else:
+            # Pick up rows ingested while the index was not running
+            max_id = await session.scalar(select(func.max(Article.id)).where(Article.embedding.is_not(None)))
+            if max_id is not None and self._known and max_id > max(self._known):
+                res = await session.execute(
+                    select(Article.id, Article.embedding).where(Article.id > max(self._known), Article.embedding.is_not(None))
+                )
+                rows = res.all()
+                await asyncio.to_thread(self.add, [r.id for r in rows], [loads_embedding(r.embedding) for r in rows])
+        self.loaded = True
+
+    async def add_articles(self, arts: Iterable[Article]):
+        if not self.loaded:
+            return
+        arts = [a for a in arts if a.id is not None and a.embedding]
+        # Searchable right away; written to disk one add at a time
+        added = self.add([a.id for a in arts], [loads_embedding(a.embedding) for a in arts], persist=False)
+        if added is not None:
+            async with self._persist_lock:
+                await self._persist(*added)
+
+ann_index = IVFIndex()
+
+def active_index():
+    """The embedding index recommend_for and ingest use, picked by EMBEDDING_INDEX."""
+    return ann_index if EMBEDDING_INDEX == "ivf" else embedding_store
@@ -0,0 +1,153 @@
+"""Maintenance commands that bring existing rows up to date.
+
+    python -m app.backfill features
+    python -m app.backfill embeddings
+    python -m app.backfill ann-index
+    python -m app.backfill near-dups
+    python -m app.backfill feature-store
+    python -m app.backfill feeds
+    python -m app.backfill search-index
+"""
+import argparse, asyncio
+from sqlalchemy import func, select, text, update
+from .db import SessionLocal, init_db
+from .models import Article, UserProfile
+from .features import features_for, is_current
+from .ann_index import ann_index
+from .vector_store import load_embedding_matrix
+from .embeddings import dumps_embedding, embed_texts, embed_texts_cached, loads_embedding
+from .ingest import item_text
+from .near_dup import NearDupIndex, simhash
+from .feature_store import feature_store
+from .feeds import rebuild_feed
+
+async def backfill_features(batch_size: int = 500) -> int:
+    """Compute keyword_features for rows that are missing them or were built from an older VOCAB."""
+    await init_db()
+    updated, last_id = 0, 0
+    async with SessionLocal() as session:
+        while True:
+            res = await session.execute(
+                select(Article.id, Article.title, Article.description, Article.content, Article.keyword_features)
+                .where(Article.id > last_id, Article.canonical_url.is_(None)).order_by(Article.id).limit(batch_size)
+            )
+            rows = res.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            stale = [{"id": r.id, "keyword_features": features_for(r.title, r.description, r.content)}
+                     for r in rows if not is_current(r.keyword_features)]
+            if stale:
+                await session.execute(update(Article), stale)
+                await session.commit()
+                updated += len(stale)
+    return updated
+
+async def backfill_embeddings(batch_size: int = 256) -> int:
+    """Re-embed rows that have no embedding or one from a different embedder (by dimension),
+    e.g. after switching EMBEDDER. Rebuild the ann-index afterwards if EMBEDDING_INDEX=ivf."""
+    await init_db()
+    dim = embed_texts(["dimension probe"]).shape[1]
+    updated, last_id = 0, 0
+    async with SessionLocal() as session:
+        while True:
+            res = await session.execute(
+                select(Article.id, Article.title, Article.description, Article.content, Article.embedding)
+                .where(Article.id > last_id, Article.canonical_url.is_(None)).order_by(Article.id).limit(batch_size)
+            )
+            rows = res.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            stale = [r for r in rows if (r.embedding is None or loads_embedding(r.embedding).shape[0] != dim)
+                     and item_text(r._asdict())]
+            if stale:
+                vecs = embed_texts_cached([item_text(r._asdict()) for r in stale])
+                await session.execute(update(Article), [{"id": r.id, "embedding": dumps_embedding(v)}
+                                                        for r, v in zip(stale, vecs)])
+                await session.commit()
+                updated += len(stale)
+    return updated
+
+async def rebuild_ann_index() -> int:
+    """Retrain the IVF index from every stored embedding and rewrite it on disk."""
+    await init_db()
+    async with SessionLocal() as session:
+        ids, vecs = await load_embedding_matrix(session)
+    ann_index.build(ids, vecs)
+    ann_index.compact()
+    return ann_index.size
+
+async def backfill_near_dups(batch_size: int = 500) -> int:
+    """Point near-duplicates among existing rows at the earliest stored copy (by id)."""
+    await init_db()
+    index = NearDupIndex()
+    updated, last_id = 0, 0
+    async with SessionLocal() as session:
+        while True:
+            res = await session.execute(
+                select(Article.id, Article.url, Article.title, Article.description, Article.canonical_url)
+                .where(Article.id > last_id).order_by(Article.id).limit(batch_size)
+            )
+            rows = res.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            dups = []
+            for r in rows:
+                if r.canonical_url:
+                    continue
+                h = simhash(r.title, r.description)
+                canonical = index.match(h)
+                if canonical is None:
+                    index.add(h, r.url)
+                else:
+                    dups.append({"id": r.id, "canonical_url": canonical})
+            if dups:
+                await session.execute(update(Article), dups)
+                await session.commit()
+                updated += len(dups)
+    return updated
+
+async def rebuild_feature_store() -> int:
+    """Rewrite the memory-mapped feature store from scratch (running workers remap it)."""
+    await init_db()
+    async with SessionLocal() as session:
+        return await feature_store.build(session, full=True)
+
+async def rebuild_feeds() -> int:
+    """Rebuild every user's materialized feed (SERVING_MODE=materialized)."""
+    await init_db()
+    async with SessionLocal() as session:
+        users = (await session.execute(select(UserProfile.user_id))).scalars().all()
+        for user_id in users:
+            await rebuild_feed(session, user_id)
+    return len(users)
+
+async def rebuild_search_index() -> int:
+    """Re-index every article in the full-text index (search.py) from the articles table."""
+    await init_db()
+    async with SessionLocal() as session:
+        await session.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+        await session.commit()
+        return (await session.execute(select(func.count()).select_from(Article))).scalar()
+
+COMMANDS = {
+    "features": backfill_features,
+    "embeddings": backfill_embeddings,
+    "ann-index": rebuild_ann_index,
+    "near-dups": backfill_near_dups,
+    "feature-store": rebuild_feature_store,
+    "feeds": rebuild_feeds,
+    "search-index": rebuild_search_index,
+}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("command", choices=sorted(COMMANDS))
+    args = ap.parse_args()
+    n = asyncio.run(COMMANDS[args.command]())
+    print(f"{args.command}: {n} rows")
+
+if __name__ == "__main__":
+    main()
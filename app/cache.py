@@ -0,0 +1,166 @@
+import asyncio, hashlib, os, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Persistent tier lives next to the main DB; TTL/size limits apply to it, item limit to memory
+CACHE_PATH = os.getenv("CACHE_PATH", "db/cache.db")
+CACHE_MEMORY_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_TTL = float(os.getenv("CACHE_TTL_DAYS", "30")) * 86400
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+class _Disk:
+    """Shared SQLite file backing every ContentCache namespace."""
+
+    evict_every = 200  # writes between eviction passes
+    touch_every = 3600  # seconds; a hit only rewrites ``accessed`` (the LRU order) once this stale
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT value, created, accessed FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > CACHE_TTL:
+                db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            if now - row[2] > self.touch_every:
+                db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, value: bytes):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (key, value, now, now))
+            self._writes += 1
+            if self._writes % self.evict_every == 0:
+                self._evict(db, now)
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        db.execute("DELETE FROM cache WHERE created < ?", (now - CACHE_TTL,))
+        total = db.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM cache").fetchone()[0]
+        if total <= CACHE_MAX_BYTES:
+            return
+        # Drop least recently used entries until we're back under ~90% of the budget
+        excess = total - int(CACHE_MAX_BYTES * 0.9)
+        for key, size in db.execute("SELECT key, LENGTH(value) FROM cache ORDER BY accessed").fetchall():
+            if excess <= 0:
+                break
+            db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            excess -= size
+
+_disk = _Disk(CACHE_PATH)
+
+class ContentCache:
+    """Two-tier cache keyed by a hash of (namespace, version, whitespace-normalized text).
+
+    ``version`` should change whenever the model or prompt does, so stale
+    results are never served. An in-process LRU sits in front of the shared
+    SQLite file. Both tiers are thread-safe; async code should use ``aget``/``aput``,
+    which keep the disk tier's queries off the event loop.
+    """
+
+    def __init__(self, namespace: str, version: str, memory_items: int = CACHE_MEMORY_ITEMS, disk: Optional[_Disk] = _disk):
+        self.namespace = namespace
+        self.version = version
+        self.memory_items = memory_items
+        self.disk = disk
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()  # the LRU and counters; embed workers run in threads
+        self.hits_memory = self.hits_disk = self.misses = 0
+
+    def key(self, text: str) -> str:
+        raw = f"{self.namespace}\0{self.version}\0{normalize_text(text)}".encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    def _remember(self, key: str, value: bytes):
+        with self._lock:
+            self._mem[key] = value
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.memory_items:
+                self._mem.popitem(last=False)
+
+    def _from_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._mem.get(key)
+            if value is not None:
+                self._mem.move_to_end(key)
+                self.hits_memory += 1
+            return value
+
+    def _from_disk(self, key: str, value: Optional[bytes]) -> Optional[bytes]:
+        if value is not None:
+            self._remember(key, value)
+        with self._lock:
+            if value is not None:
+                self.hits_disk += 1
+            else:
+                self.misses += 1
+        return value
+
+    def get(self, text: str) -> Optional[bytes]:
+        key = self.key(text)
+        value = self._from_memory(key)
+        if value is not None:
+            return value
+        return self._from_disk(key, self.disk.get(key) if self.disk is not None else None)
+
+    async def aget(self, text: str) -> Optional[bytes]:
+        key = self.key(text)
+        value = self._from_memory(key)
+        if value is not None:
+            return value
+        return self._from_disk(key, await asyncio.to_thread(self.disk.get, key) if self.disk is not None else None)
+
+    def put(self, text: str, value: bytes):
+        key = self.key(text)
+        self._remember(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    async def aput(self, text: str, value: bytes):
+        key = self.key(text)
+        self._remember(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, value)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits_memory": self.hits_memory, "hits_disk": self.hits_disk,
+                    "misses": self.misses, "memory_items": len(self._mem)}
+
+# Every ContentCache created, by namespace, for /cache-stats
+_registry: Dict[str, ContentCache] = {}
+
+def content_cache(namespace: str, version: str) -> ContentCache:
+    cache = _registry.get(namespace)
+    if cache is None or cache.version != version:
+        cache = _registry[namespace] = ContentCache(namespace, version)
+    return cache
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+# GDELT's seendate, e.g. 20240115T103000Z
+_GDELT_FORMAT = "%Y%m%dT%H%M%SZ"
+
+def parse_published_at(value: Optional[str]) -> Optional[datetime]:
+    """Timezone-aware UTC datetime from a NewsAPI (ISO 8601) or GDELT (seendate) timestamp."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            dt = datetime.strptime(value, _GDELT_FORMAT)
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
@@ -1,7 +1,92 @@
+import os, time
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .metrics import db_query_seconds
 
-DATABASE_URL = "sqlite+aiosqlite:///db/news.db"
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///db/news.db")
+# Storage tuning. WAL lets readers run alongside a writer (and commits skip most fsyncs with
+# synchronous=NORMAL); SQLITE_WAL=0 falls back to the rollback journal.
+SQLITE_WAL = os.getenv("SQLITE_WAL", "1") != "0"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", str(64 * 1024)))  # KiB of page cache per connection
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms to wait on another process's lock
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+
+def _pragmas(read_only: bool):
+    pragmas = [
+        f"PRAGMA journal_mode={'WAL' if SQLITE_WAL else 'DELETE'}",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas = pragmas[1:] + ["PRAGMA query_only=1"]  # the writer owns the journal mode
+    return pragmas
+
+def _configure(engine, read_only: bool = False):
+    pragmas = _pragmas(read_only)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context, which goes away with the statement even if it raises
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        # Labelled by statement verb (SELECT/INSERT/UPDATE/...) to keep the series count small
+        db_query_seconds.observe(time.perf_counter() - context.query_started, statement.lstrip().split(" ", 1)[0].upper())
+    return engine
+
+# SQLite allows one writer at a time, so writes share a single connection and queue for it
+# in the pool rather than failing with "database is locked"; reads get their own pool.
+# (aiosqlite file databases default to NullPool, i.e. a new connection per session.)
+engine = _configure(create_async_engine(DATABASE_URL, echo=False, future=True, poolclass=AsyncAdaptedQueuePool,
+                                        pool_size=1, max_overflow=0, pool_timeout=120))
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
-Base = declarative_base()
\ No newline at end of file
+if ":memory:" in DATABASE_URL:
+    read_engine = engine  # a private in-memory DB can't be shared between engines
+else:
+    read_engine = _configure(create_async_engine(DATABASE_URL, echo=False, future=True, poolclass=AsyncAdaptedQueuePool,
+                                                 pool_size=DB_READ_POOL_SIZE, max_overflow=0, pool_timeout=30),
+                             read_only=True)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
+
+Base = declarative_base()
+
+def _add_missing_columns(sync_conn):
+    # create_all never alters existing tables, so add new nullable columns/indexes by hand
+    insp = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name not in existing:
+                ddl = col.type.compile(dialect=sync_conn.dialect)
+                sync_conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {ddl}")
+        for idx in table.indexes:
+            idx.create(sync_conn, checkfirst=True)
+
+def _run_migrations(sync_conn):
+    from .migrations import MIGRATIONS
+    version = sync_conn.exec_driver_sql("PRAGMA user_version").scalar()
+    for i, migrate in enumerate(MIGRATIONS[version:], start=version + 1):
+        print(f"Running migration {i}: {migrate.__name__}")
+        migrate(sync_conn)
+        sync_conn.exec_driver_sql(f"PRAGMA user_version = {i}")
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_run_migrations)
@@ -1,9 +1,23 @@
-import json, numpy as np
+import json, os, struct, numpy as np
 import hashlib
-from typing import List
+from functools import lru_cache
+from typing import List, Sequence, Union
+from .cache import content_cache
+from .metrics import embed_batch_seconds, embedded_texts
 
-def embed_text(text: str) -> List[float]:
-    # Simple hash-based embedding for now (will replace with sentence-transformers later)
+# "hash" is the fast deterministic placeholder; "sentence-transformers" runs EMBEDDING_MODEL on CPU.
+# Switching changes the vector space, so re-embed stored rows afterwards (python -m app.backfill embeddings).
+EMBEDDER = os.getenv("EMBEDDER", "hash")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))  # texts per forward pass
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # torch intra-op threads, 0 = torch default
+
+# Bump when embed_text changes so cached vectors from the old embedder are not reused
+EMBEDDER_VERSION = "hash-md5-16" if EMBEDDER == "hash" else f"st:{EMBEDDING_MODEL}"
+embedding_cache = content_cache("embedding", EMBEDDER_VERSION)
+
+def hash_embed(text: str) -> List[float]:
+    # Simple hash-based embedding, kept as the fast fallback mode
     # This creates a deterministic vector based on text content
     hash_obj = hashlib.md5(text.encode())
     hash_bytes = hash_obj.digest()
@@ -13,8 +27,73 @@ def embed_text(text: str) -> List[float]:
     vec = vec / (np.linalg.norm(vec) + 1e-9)  # Normalize
     return vec.tolist()
 
-def dumps_embedding(vec: List[float]) -> str:
-    return json.dumps(vec)
+@lru_cache(maxsize=1)
+def _model():
+    # Imported and loaded on first use: torch + the model take seconds and hundreds of MB
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if EMBEDDING_THREADS:
+        torch.set_num_threads(EMBEDDING_THREADS)
+    print(f"Loading embedding model {EMBEDDING_MODEL}")
+    return SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+
+def embed_texts(texts: Sequence[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """Unit-length float32 embeddings for ``texts``, one row each, encoded ``batch_size`` at a time."""
+    embedded_texts.inc(EMBEDDER, amount=len(texts))
+    with embed_batch_seconds.time(EMBEDDER):
+        if EMBEDDER == "hash":
+            return np.array([hash_embed(t) for t in texts], dtype=np.float32).reshape(len(texts), -1)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vecs = _model().encode(list(texts), batch_size=batch_size, normalize_embeddings=True,
+                               convert_to_numpy=True, show_progress_bar=False)
+        return vecs.astype(np.float32, copy=False)
+
+def embed_text(text: str) -> List[float]:
+    return embed_texts([text])[0].tolist()
+
+# Binary layout: b"EM", format version, dtype code, uint32 dim, then little-endian floats.
+# The 8-byte header keeps the float payload aligned for np.frombuffer.
+_HEADER = struct.Struct("<2sBBI")
+_MAGIC = b"EM"
+_FORMAT_VERSION = 1
+_DTYPES = {0: np.dtype("<f4"), 1: np.dtype("<f2")}
+_DTYPE_CODES = {"float32": 0, "float16": 1}
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")
+
+def dumps_embedding(vec: Sequence[float], dtype: str = EMBEDDING_DTYPE) -> bytes:
+    code = _DTYPE_CODES[dtype]
+    arr = np.asarray(vec, dtype=_DTYPES[code])
+    return _HEADER.pack(_MAGIC, _FORMAT_VERSION, code, len(arr)) + arr.tobytes()
+
+def loads_embedding(s: Union[bytes, str]) -> np.ndarray:
+    """Decode a stored embedding; binary rows are read zero-copy, legacy JSON rows are parsed."""
+    if isinstance(s, str):
+        return np.array(json.loads(s), dtype=np.float32)
+    magic, version, code, dim = _HEADER.unpack_from(s)
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        raise ValueError(f"unknown embedding encoding {magic!r} v{version}")
+    return np.frombuffer(s, dtype=_DTYPES[code], count=dim, offset=_HEADER.size)
+
+def embed_texts_cached(texts: Sequence[str]) -> List[List[float]]:
+    """embed_texts through the content-hash cache (always stored as float32); misses are
+    encoded together in one batch."""
+    out = [None] * len(texts)
+    misses = {}
+    for i, text in enumerate(texts):
+        cached = embedding_cache.get(text)
+        if cached is not None:
+            out[i] = loads_embedding(cached).tolist()
+        else:
+            misses.setdefault(text, []).append(i)
+    if misses:
+        for text, vec in zip(misses, embed_texts(list(misses))):
+            blob = dumps_embedding(vec, "float32")
+            embedding_cache.put(text, blob)
+            for i in misses[text]:
+                out[i] = loads_embedding(blob).tolist()
+    return out
 
-def loads_embedding(s: str) -> np.ndarray:
-    return np.array(json.loads(s), dtype=float)
+def embed_text_cached(text: str) -> List[float]:
+    """embed_text through the content-hash cache (always stored as float32)."""
+    return embed_texts_cached([text])[0]
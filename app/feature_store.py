@@ -0,0 +1,317 @@
+import asyncio, fcntl, json, mmap, os, time
+import numpy as np
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import String, null, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Article
+from .embeddings import loads_embedding
+from .features import VOCAB, _NBYTES, features_for, is_current, profile_vector
+from .result_cache import bump_corpus_version
+from .dates import utcnow
+
+# The recommender's hot columns for recent articles in one memory-mapped file, so uvicorn
+# workers share a single copy through the page cache instead of each holding their own.
+# One worker (whoever holds the lock file) rebuilds it every FEATURE_STORE_REFRESH seconds
+# and swaps it in with os.replace; the others notice the new file and remap it.
+# FEATURE_STORE=1 turns it on; without it (or while the file is stale) reco reads SQLite.
+FEATURE_STORE = os.getenv("FEATURE_STORE", "0") == "1"
+FEATURE_STORE_PATH = os.getenv("FEATURE_STORE_PATH", "db/feature_store.bin")
+FEATURE_STORE_REFRESH = float(os.getenv("FEATURE_STORE_REFRESH", "60"))  # seconds
+# A file not rebuilt for this long (its writer died, or the store was turned off) is ignored
+FEATURE_STORE_MAX_AGE = 3 * FEATURE_STORE_REFRESH  # seconds
+# Rows published within this long before the build; must exceed reco's 36-hour window
+FEATURE_STORE_WINDOW = timedelta(hours=float(os.getenv("FEATURE_STORE_WINDOW_HOURS", "48")))
+# Refreshes only append new rows; a full rebuild also picks up edits (backfills, near-dup marks)
+FEATURE_STORE_FULL_REBUILD = 3600  # seconds
+# Candidates per matrix multiply in FeatureColumns.top_many
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "4096"))
+_MAGIC = b"NEWSFS01"
+_ALIGN = 64
+_CREATED = type_coerce(Article.created_at, String).label("created")  # as reco.CREATED
+
+def _epoch(dt) -> float:
+    return dt.timestamp() if dt is not None else 0.0
+
+def _sortable(x: np.ndarray) -> np.ndarray:
+    """float32 -> uint32 keys that sort in the same order."""
+    bits = x.astype(np.float32).view(np.uint32)
+    return np.where(bits >> np.uint32(31), ~bits, bits | np.uint32(0x80000000))
+
+def write_store(path: str, columns: Dict[str, np.ndarray], meta: Dict):
+    """Write ``columns`` as aligned raw arrays behind a JSON header, atomically replacing ``path``."""
+    header, offset = {**meta, "columns": {}}, 0
+    for name, arr in columns.items():
+        header["columns"][name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+    blob = json.dumps(header).encode()
+    start = -(-(len(_MAGIC) + 8 + len(blob)) // _ALIGN) * _ALIGN
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC + len(blob).to_bytes(8, "little") + blob)
+        for name, arr in columns.items():
+            f.seek(start + header["columns"][name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class FeatureColumns:
+    """Column arrays (ids, created, published, features, embeddings, embedded) of the
+    candidate articles, ranked with numpy; mapped from the store file or loaded from SQLite."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], meta: Dict):
+        self.columns = columns
+        self.meta = meta
+        self.ids = columns["ids"]
+        self.created = columns["created"]
+        self.published = columns["published"]
+        self.features = columns["features"]
+        self.embeddings = columns["embeddings"]
+        self.embedded = columns["embedded"]
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.embeddings.shape[1]
+
+    def covers(self, since) -> bool:
+        """Whether every row published at or after ``since`` was included when this was built,
+        and (for a store file) it was built recently enough to still be trusted."""
+        built_at = self.meta.get("built_at")
+        if built_at is not None and time.time() - built_at > FEATURE_STORE_MAX_AGE:
+            return False
+        return self.meta["since"] <= _epoch(since)
+
+    def keyword_scores(self, interests: Sequence[str]) -> Optional[np.ndarray]:
+        """hits . weights per row, or None if a profile needs article text (interests outside VOCAB)."""
+        vec, extra = profile_vector(interests)
+        if extra is not None:
+            return None
+        # Only the profile's own keywords are read out of the packed bits (see features.extract_features)
+        scores = np.zeros(self.size, dtype=np.float32)
+        for j in np.flatnonzero(vec):
+            scores += vec[j] * ((self.features[:, j >> 3] >> (7 - (j & 7))) & 1)
+        return scores
+
+    def similarities(self, query: Sequence[float]) -> Optional[np.ndarray]:
+        q = np.asarray(query, dtype=np.float32)
+        if q.shape != (self.dim,):
+            return None
+        q = q / (np.linalg.norm(q) + 1e-9)
+        return self.embeddings @ q
+
+    def top(self, scores: np.ndarray, since, k: int, before: Optional[Tuple] = None,
+            embedded_only: bool = False) -> List[Tuple]:
+        """Best ``k`` (score, created, id) keys published at or after ``since`` and ranked below ``before``."""
+        mask = self.published >= _epoch(since)
+        if embedded_only:
+            mask &= self.embedded
+        if before is not None:
+            score, created, last = before
+            created = created.encode()
+            mask &= (scores < score) | ((scores == score) & ((self.created < created)
+                                                             | ((self.created == created) & (self.ids < last))))
+        rows = np.flatnonzero(mask)
+        if len(rows) > k:
+            # Everything tied with the k-th score is kept, the tie-break on (created, id) comes next
+            kth = np.partition(scores[rows], len(rows) - k)[len(rows) - k]
+            rows = rows[scores[rows] >= kth]
+        order = rows[np.lexsort((self.ids[rows], self.created[rows], scores[rows]))[::-1][:k]]
+        return [(float(scores[i]), self.created[i].decode(), int(self.ids[i])) for i in order]
+
+    def top_many(self, weights: np.ndarray, embedding: bool, since, k: int) -> List[List[int]]:
+        """Ids of the best ``k`` rows published at or after ``since`` for every row of ``weights``
+        (users x VOCAB keyword weights, or users x dim normalized profile embeddings), in the
+        order ``top`` gives each of them: one matrix multiply per chunk of candidates."""
+        rows = np.flatnonzero((self.published >= _epoch(since)) & (self.embedded if embedding else True))
+        # Candidates in (created, id) order, so a column's position is its tie-break rank
+        rows = rows[np.lexsort((self.ids[rows], self.created[rows]))]
+        best = np.zeros((len(weights), 0), dtype=np.uint64)
+        for start in range(0, len(rows), BATCH_CHUNK_SIZE):
+            chunk = rows[start:start + BATCH_CHUNK_SIZE]
+            if embedding:
+                matrix = self.embeddings[chunk]
+            else:
+                matrix = np.unpackbits(self.features[chunk], axis=1, count=len(VOCAB)).astype(np.float32)
+            keys = (_sortable(weights @ matrix.T).astype(np.uint64) << np.uint64(32)) \
+                | np.arange(start, start + len(chunk), dtype=np.uint64)
+            best = np.concatenate([best, keys], axis=1)
+            if best.shape[1] > k:
+                best = np.partition(best, best.shape[1] - k, axis=1)[:, -k:]
+        best = np.sort(best, axis=1)[:, ::-1]
+        ids = self.ids[rows[(best & np.uint64(0xFFFFFFFF)).astype(np.int64)]] if len(rows) else best.astype(np.int64)
+        return ids.tolist()
+
+class StoreView(FeatureColumns):
+    """Read-only numpy views over one mapped generation of the store file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a feature store file")
+        size = int.from_bytes(self._mm[len(_MAGIC):len(_MAGIC) + 8], "little")
+        meta = json.loads(self._mm[len(_MAGIC) + 8:len(_MAGIC) + 8 + size])
+        start = -(-(len(_MAGIC) + 8 + size) // _ALIGN) * _ALIGN
+        columns = {}
+        for name, c in meta.pop("columns").items():
+            shape = tuple(c["shape"])
+            columns[name] = np.frombuffer(self._mm, dtype=np.dtype(c["dtype"]), count=int(np.prod(shape)),
+                                          offset=start + c["offset"]).reshape(shape)
+        super().__init__(columns, meta)
+
+async def _rows(session: AsyncSession, since, after: int = 0, embeddings: bool = True) -> Tuple[List, List]:
+    """The store's rows as fetched, and the text of those with stale keyword features; see _decoded."""
+    embedding = Article.embedding if embeddings else null().label("embedding")
+    res = await session.execute(
+        select(Article.id, _CREATED, Article.published_at, Article.keyword_features, embedding)
+        .where(Article.id > after, Article.published_at >= since, Article.canonical_url.is_(None))
+        .order_by(Article.id)
+    )
+    rows = res.all()
+    stale = [r.id for r in rows if not is_current(r.keyword_features)]
+    texts = []
+    if stale:
+        res = await session.execute(
+            select(Article.id, Article.title, Article.description, Article.content).where(Article.id.in_(stale))
+        )
+        texts = res.all()
+    return rows, texts
+
+def _decoded(rows: List, texts: List) -> List:
+    # (id, created, published epoch, packed features, embedding) per row of _rows; converting
+    # the column values is most of a build's CPU time, so builds do it in a thread
+    features = {r.id: features_for(r.title, r.description, r.content) for r in texts}
+    return [(r.id, r.created or "", _epoch(r.published_at), features.get(r.id, r.keyword_features),
+             loads_embedding(r.embedding) if r.embedding else None) for r in rows]
+
+def _columns(rows: List, dim: int) -> Dict[str, np.ndarray]:
+    embeddings = np.zeros((len(rows), dim), dtype=np.float32)
+    embedded = np.zeros(len(rows), dtype=bool)
+    for i, r in enumerate(rows):
+        # Vectors from a different embedder (dim mismatch) can't be compared, so skip them
+        if r[4] is not None and len(r[4]) == dim:
+            embeddings[i], embedded[i] = r[4], True
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9
+    return {
+        "ids": np.array([r[0] for r in rows], dtype=np.int64),
+        "created": np.array([r[1].encode() for r in rows], dtype="S32"),
+        "published": np.array([r[2] for r in rows], dtype=np.float64),
+        "features": np.frombuffer(b"".join(r[3][1:] for r in rows), dtype=np.uint8).reshape(len(rows), _NBYTES),
+        "embeddings": embeddings,
+        "embedded": embedded,
+    }
+
+async def load_columns(session: AsyncSession, since, embeddings: bool = True) -> FeatureColumns:
+    """The store's columns for rows published at or after ``since``, read from SQLite into memory
+    (with empty embeddings unless ``embeddings``)."""
+    rows = _decoded(*await _rows(session, since, embeddings=embeddings))
+    dims = [len(r[4]) for r in rows if r[4] is not None]
+    return FeatureColumns(_columns(rows, dims[-1] if dims else 0), {"since": _epoch(since)})
+
+class FeatureStore:
+    """Maps the newest store file on demand and (in one worker at a time) keeps it fresh."""
+
+    def __init__(self, path: str = FEATURE_STORE_PATH, refresh: float = FEATURE_STORE_REFRESH,
+                 window: timedelta = FEATURE_STORE_WINDOW):
+        self.path = path
+        self.refresh = refresh
+        self.window = window
+        self._view: Optional[StoreView] = None
+        self._checked = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def view(self) -> Optional[StoreView]:
+        """The current generation, remapped at most once a second if the file was replaced."""
+        now = time.monotonic()
+        if now - self._checked >= 1.0:
+            self._checked = now
+            try:
+                inode = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                return self._view
+            if self._view is None or inode != self._view.inode:
+                try:
+                    self._view = StoreView(self.path)
+                except (OSError, ValueError) as e:
+                    print(f"Feature store not mapped: {e!r}")
+                    return self._view
+                bump_corpus_version()
+        return self._view
+
+    async def build(self, session: AsyncSession, full: bool = False) -> int:
+        """Write a new generation: the previous one plus rows added since, minus rows that left
+        the window (or everything re-read from SQLite when ``full``). Returns its row count."""
+        now = utcnow()
+        since = now - self.window
+        prev = self.view()
+        if prev is not None and (prev.meta["dim"] is None or time.time() - prev.meta["full_at"] >= FEATURE_STORE_FULL_REBUILD):
+            full = True
+        if full:
+            prev = None
+        after = int(prev.meta["max_id"]) if prev is not None else 0
+        rows, texts = await _rows(session, since, after)
+        # Decoding, packing and the write (with its fsync) run in a thread; only the
+        # queries above and the remap in view() stay on the event loop
+        return await asyncio.to_thread(self._write, rows, texts, since, prev, after)
+
+    def _write(self, rows: List, texts: List, since, prev: Optional[StoreView], after: int) -> int:
+        # The new generation: ``rows`` appended to what ``prev`` (if any) still has in the window
+        rows = _decoded(rows, texts)
+        dims = [len(r[4]) for r in rows if r[4] is not None]
+        columns = _columns(rows, prev.dim if prev is not None else (dims[-1] if dims else 0))
+        dim = columns["embeddings"].shape[1]
+        if prev is not None:
+            keep = np.flatnonzero(prev.published >= _epoch(since))
+            columns = {name: np.concatenate([prev.columns[name][keep], col]) for name, col in columns.items()}
+        meta = {"since": _epoch(since), "built_at": time.time(),
+                "full_at": time.time() if prev is None else prev.meta["full_at"],
+                "max_id": max(int(columns["ids"].max(initial=0)), after), "dim": dim or None}
+        write_store(self.path, columns, meta)
+        return len(columns["ids"])
+
+    async def refresh_once(self, session: AsyncSession) -> Optional[int]:
+        """Rebuild if the file is older than ``refresh`` and no other process is rebuilding it."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".lock", "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            try:
+                if os.path.exists(self.path) and time.time() - os.path.getmtime(self.path) < self.refresh:
+                    return None
+                return await self.build(session)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    async def _loop(self):
+        from .db import ReadSessionLocal
+        while True:
+            try:
+                async with ReadSessionLocal() as session:
+                    await self.refresh_once(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Feature store refresh failed: {e!r}")
+            await asyncio.sleep(self.refresh / 4)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+feature_store = FeatureStore()
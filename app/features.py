@@ -0,0 +1,69 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .keywords import CATEGORY_KEYWORDS, CATEGORY_TRIGGERS, KeywordMatcher, profile_weights
+
+# Fixed keyword vocabulary every article is scored against at ingest time.
+# Bump FEATURES_VERSION whenever VOCAB changes so stale rows get recomputed.
+VOCAB: List[str] = sorted({kw for kws in CATEGORY_KEYWORDS.values() for kw in kws}
+                          | {t for ts in CATEGORY_TRIGGERS.values() for t in ts})
+VOCAB_INDEX: Dict[str, int] = {kw: i for i, kw in enumerate(VOCAB)}
+FEATURES_VERSION = 1
+_NBYTES = (len(VOCAB) + 7) // 8
+
+_vocab_matcher = KeywordMatcher({kw: 1.0 for kw in VOCAB})
+
+def article_text(title, description, content) -> str:
+    # Exactly the string recommend_for has always matched against
+    return f"{title} {description} {content}".lower()
+
+def extract_features(text: str) -> bytes:
+    """Bit-packed VOCAB hit vector for already-lowercased text, prefixed with FEATURES_VERSION."""
+    bits = np.zeros(len(VOCAB), dtype=np.uint8)
+    for kw in _vocab_matcher.hits(text):
+        bits[VOCAB_INDEX[kw]] = 1
+    return bytes([FEATURES_VERSION]) + np.packbits(bits).tobytes()
+
+def features_for(title, description, content) -> bytes:
+    return extract_features(article_text(title, description, content))
+
+def is_current(blob: Optional[bytes]) -> bool:
+    return bool(blob) and blob[0] == FEATURES_VERSION and len(blob) == _NBYTES + 1
+
+def hit_matrix(blobs: Sequence[bytes]) -> np.ndarray:
+    """Stack current feature blobs into an (n, len(VOCAB)) 0/1 matrix."""
+    if not blobs:
+        return np.zeros((0, len(VOCAB)), dtype=np.float32)
+    packed = np.frombuffer(b"".join(b[1:] for b in blobs), dtype=np.uint8).reshape(len(blobs), _NBYTES)
+    return np.unpackbits(packed, axis=1, count=len(VOCAB)).astype(np.float32)
+
+@lru_cache(maxsize=64)
+def _profile_vector(interests: Tuple[str, ...]):
+    weights = profile_weights(interests)
+    vec = np.zeros(len(VOCAB), dtype=np.float32)
+    extra = {}
+    for kw, w in weights.items():
+        if kw in VOCAB_INDEX:
+            vec[VOCAB_INDEX[kw]] = w
+        else:
+            extra[kw] = w
+    return vec, (KeywordMatcher(extra) if extra else None)
+
+def profile_vector(interests: Sequence[str]):
+    """Split a profile into a VOCAB weight vector and a matcher for interests outside VOCAB."""
+    return _profile_vector(tuple(sorted(interests)))
+
+def score_articles(arts, interests: Sequence[str]) -> List[float]:
+    """Keyword score per article from stored feature vectors: hits . weights.
+
+    Rows without current features, and interests that are not in VOCAB, fall
+    back to matching the article text.
+    """
+    vec, extra = profile_vector(interests)
+    blobs = [a.keyword_features if is_current(a.keyword_features)
+             else features_for(a.title, a.description, a.content) for a in arts]
+    scores = hit_matrix(blobs) @ vec
+    if extra is not None:
+        scores = scores + np.array([extra.score(article_text(a.title, a.description, a.content))
+                                    for a in arts], dtype=np.float32)
+    return scores.tolist()
@@ -0,0 +1,175 @@
+import os
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, bindparam, delete, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .db import ReadSessionLocal
+from .models import Article, FeedItem, UserFeed, UserProfile
+from .features import article_text, features_for, hit_matrix, is_current, profile_vector
+from .reco import CANONICAL, CREATED, RECENT_WINDOW, decode_cursor, encode_cursor, keyword_top
+from .dates import utcnow
+
+# "on-read" ranks on every /recommendations call (reco.recommend_page). "materialized" also
+# keeps each user's top FEED_SIZE keyword-ranked articles in feed_items: ingest merges every
+# committed batch into them (fan-out on write), a profile change rebuilds the user's feed,
+# and keyword pages are served from it with one indexed read when it can answer exactly.
+SERVING_MODE = os.getenv("SERVING_MODE", "on-read")
+MATERIALIZED = SERVING_MODE == "materialized"
+FEED_SIZE = int(os.getenv("FEED_SIZE", "100"))
+# recommend_page's order: score, then created, then id, all descending
+RANK = (FeedItem.score.desc(), FeedItem.created.desc(), FeedItem.article_id.desc())
+
+def _interests(raw: Optional[str]) -> List[str]:
+    return [s.strip().lower() for s in (raw or "").split(",") if s.strip()]
+
+def _horizon(feed: UserFeed) -> Optional[Tuple]:
+    return None if feed.horizon_id is None else (feed.horizon_score, feed.horizon_created, feed.horizon_id)
+
+def _below(key: Tuple):
+    score, created, article_id = key
+    return or_(FeedItem.score < score,
+               and_(FeedItem.score == score, or_(FeedItem.created < created,
+                                                 and_(FeedItem.created == created, FeedItem.article_id < article_id))))
+
+async def fan_out(session: AsyncSession, arts: Sequence[Article], user_ids: Optional[List[str]] = None) -> int:
+    """Merge newly committed articles into the materialized feeds (of ``user_ids``, default every
+    built feed): scored against all profiles at once, kept where they rank above the feed's
+    horizon, then each feed is trimmed back to FEED_SIZE. Returns the feed rows added."""
+    cutoff = utcnow() - RECENT_WINDOW
+    # Rows that left the 36-hour window are never served
+    await session.execute(delete(FeedItem).where(FeedItem.published_at < cutoff))
+    arts = [a for a in arts if a.id is not None and a.canonical_url is None
+            and a.published_at is not None and a.published_at >= cutoff]
+    if not arts:
+        return 0
+    query = select(UserFeed, UserProfile.interests).join(UserProfile, UserProfile.user_id == UserFeed.user_id)
+    if user_ids is not None:
+        query = query.where(UserFeed.user_id.in_(user_ids))
+    feeds = [(feed, interests) for feed, raw in (await session.execute(query)).all() if (interests := _interests(raw))]
+    if not feeds:
+        return 0
+    res = await session.execute(select(Article.id, CREATED).where(Article.id.in_([a.id for a in arts])))
+    created = {r.id: r.created or "" for r in res.all()}
+
+    # The same scores as features.score_articles, for every profile in one multiply
+    hits = hit_matrix([a.keyword_features if is_current(a.keyword_features)
+                       else features_for(a.title, a.description, a.content) for a in arts])
+    vecs, extras = zip(*(profile_vector(interests) for _, interests in feeds))
+    scores = np.stack(vecs) @ hits.T
+    texts = None
+    for row, extra in enumerate(extras):
+        if extra is not None:
+            texts = texts or [article_text(a.title, a.description, a.content) for a in arts]
+            scores[row] += np.array([extra.score(t) for t in texts], dtype=np.float32)
+
+    floors = np.array([-np.inf if feed.horizon_id is None else feed.horizon_score for feed, _ in feeds])
+    rows, touched = [], {}
+    for row, col in zip(*np.nonzero(scores >= floors[:, None])):
+        feed, a = feeds[row][0], arts[col]
+        key = (float(scores[row, col]), created[a.id], a.id)
+        horizon = _horizon(feed)
+        if horizon is None or key > horizon:
+            rows.append({"user_id": feed.user_id, "article_id": a.id, "score": key[0], "created": key[1],
+                         "published_at": a.published_at})
+            touched[feed.user_id] = feed
+    for start in range(0, len(rows), 5000):
+        await session.execute(sqlite_insert(FeedItem).on_conflict_do_nothing(), rows[start:start + 5000])
+    await _trim(session, touched, cutoff)
+    return len(rows)
+
+async def _trim(session: AsyncSession, feeds: Dict[str, UserFeed], cutoff):
+    """Cut feeds back to FEED_SIZE, raising each horizon to the best row cut."""
+    users = list(feeds)
+    for start in range(0, len(users), 500):
+        ranked = select(
+            FeedItem.user_id, FeedItem.article_id, FeedItem.score, FeedItem.created,
+            func.row_number().over(partition_by=FeedItem.user_id, order_by=RANK).label("rn"),
+        ).where(FeedItem.user_id.in_(users[start:start + 500]), FeedItem.published_at >= cutoff).subquery()
+        res = await session.execute(select(ranked).where(ranked.c.rn > FEED_SIZE))
+        cut = res.all()
+        if not cut:
+            continue
+        items = FeedItem.__table__  # executemany DELETE is Core-only
+        await session.execute(
+            delete(items).where(items.c.user_id == bindparam("u"), items.c.article_id == bindparam("a")),
+            [{"u": r.user_id, "a": r.article_id} for r in cut],
+        )
+        horizons = []
+        for r in cut:
+            if r.rn != FEED_SIZE + 1:
+                continue
+            horizon = _horizon(feeds[r.user_id])
+            key = (r.score, r.created, r.article_id)
+            if horizon is None or key > horizon:
+                horizons.append({"user_id": r.user_id, "horizon_score": key[0], "horizon_created": key[1],
+                                 "horizon_id": key[2]})
+        if horizons:
+            await session.execute(update(UserFeed), horizons)
+
+async def rebuild_feed(session: AsyncSession, user_id: str) -> int:
+    """Recompute a user's feed from the current profile; ``session`` is the writer, the
+    ranking itself reads through the read pool. Returns the feed's size."""
+    cutoff = utcnow() - RECENT_WINDOW
+    async with ReadSessionLocal() as reader:
+        raw = await reader.scalar(select(UserProfile.interests).where(UserProfile.user_id == user_id))
+        if raw is None:
+            return 0  # no profile, nothing to materialize
+        max_id = await reader.scalar(select(func.max(Article.id))) or 0
+        interests = _interests(raw)
+        top = await keyword_top(reader, interests, (Article.published_at >= cutoff, Article.id <= max_id, CANONICAL),
+                                FEED_SIZE + 1, None) if interests else []
+        res = await reader.execute(select(Article.id, Article.published_at).where(Article.id.in_([i for _, _, i in top])))
+        published = dict(res.all())
+    if await session.scalar(select(UserProfile.interests).where(UserProfile.user_id == user_id)) != raw:
+        return 0  # changed meanwhile; the feed stays missing until the next read asks again
+
+    horizon = top[FEED_SIZE] if len(top) > FEED_SIZE else (None, None, None)
+    await session.execute(delete(FeedItem).where(FeedItem.user_id == user_id))
+    values = {"horizon_score": horizon[0], "horizon_created": horizon[1], "horizon_id": horizon[2], "built_at": utcnow()}
+    await session.execute(
+        sqlite_insert(UserFeed).values(user_id=user_id, **values).on_conflict_do_update(index_elements=["user_id"], set_=values)
+    )
+    if top[:FEED_SIZE]:
+        await session.execute(sqlite_insert(FeedItem), [
+            {"user_id": user_id, "article_id": i, "score": score, "created": created, "published_at": published[i]}
+            for score, created, i in top[:FEED_SIZE]])
+    # Articles committed after the snapshot above missed this feed in their own fan-out
+    res = await session.execute(select(Article).where(Article.id > max_id, Article.published_at >= cutoff, CANONICAL))
+    await fan_out(session, res.scalars().all(), user_ids=[user_id])
+    await session.commit()
+    return min(len(top), FEED_SIZE)
+
+async def read_feed(session: AsyncSession, user_id: str, k: int = 10,
+                    cursor: Optional[str] = None) -> Tuple[Optional[Tuple[List[Article], Optional[str]]], bool]:
+    """The page recommend_page would return for keyword ranking, if the feed holds it.
+
+    Returns ``(page, rebuild)``: ``page`` is (articles, next cursor) or None when it has to be
+    ranked on read; ``rebuild`` says whether rebuilding the feed would let it answer (never
+    for a user without a profile).
+    Raises ValueError for a malformed cursor.
+    """
+    position = decode_cursor(cursor) if cursor else {"n": 0}
+    feed = await session.get(UserFeed, user_id)
+    if feed is None:
+        # Only users with a profile get a feed; anyone else is ranked on read
+        profile = await session.scalar(select(UserProfile.user_id).where(UserProfile.user_id == user_id))
+        return None, profile is not None
+    if "f" in position:
+        return None, False  # past the ranked part, into the fallback
+    query = (select(Article, FeedItem.score, FeedItem.created)
+             .join(FeedItem, FeedItem.article_id == Article.id)
+             .where(FeedItem.user_id == user_id, FeedItem.published_at >= utcnow() - RECENT_WINDOW)
+             .order_by(*RANK).limit(k))
+    if "s" in position:
+        query = query.where(_below((position["s"], position["c"], position["i"])))
+    rows = (await session.execute(query)).all()
+    horizon = _horizon(feed)
+    if not rows or len(rows) < k:
+        return None, horizon is not None
+    last = (rows[-1].score, rows[-1].created, rows[-1].Article.id)
+    if horizon is not None and last <= horizon:
+        # Something cut from the feed may rank here
+        return None, True
+    next_cursor = encode_cursor({"s": last[0], "c": last[1], "i": last[2], "n": position["n"] + k})
+    return ([r.Article for r in rows], next_cursor), False
@@ -1,158 +1,110 @@
-import os, time, requests
-from typing import List, Dict
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
+import asyncio, os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-# Load environment variables
-load_dotenv()
+# bs4 and httpx (async client) are imported where they are used,
+# so importing this module stays cheap for the API process
+if TYPE_CHECKING:
+    import httpx
 
-NEWSAPI = "https://newsapi.org/v2/top-headlines"
-GDELT  = "https://api.gdeltproject.org/api/v2/doc/doc"
+from .metrics import fetch_errors, fetch_seconds
+
+# Overridable so benchmarks can point them at a local stand-in (benchmarks/stubs.py)
+NEWSAPI = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2/top-headlines")
+GDELT  = os.getenv("GDELT_URL", "https://api.gdeltproject.org/api/v2/doc/doc")
 USER_AGENT = {"User-Agent": "NewsAggregator/0.1 (+noncommercial)"}
 
+# Async fetch tuning: per-request timeout and max upstream requests in flight
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "20"))
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+
 def clean_html_to_text(html: str) -> str:
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, "lxml")
     for t in soup(["script","style","noscript"]): t.extract()
     return soup.get_text("\n")
 
-def newsapi_fetch(country="us", page_size=50, category=None) -> List[Dict]:
+# Expanded reputable sources including sports-specific ones
+SPORTS_SOURCES = [
+    "bbc-news", "cnn", "reuters", "associated-press", "bloomberg", 
+    "business-insider", "engadget", "techcrunch", "wired", "the-verge",
+    "npr", "abc-news", "cbs-news", "nbc-news", "fox-news", "usa-today",
+    "the-washington-post", "the-new-york-times", "wall-street-journal",
+    "time", "newsweek", "fortune", "forbes", "wsj", "espn", "bleacher-report",
+    "sporting-news", "cbssports", "nbcsports", "foxsports", "the-athletic"
+]
+CATEGORY_SOURCES = [
+    "bbc", "cnn", "reuters", "bloomberg", "techcrunch", 
+    "wired", "verge", "engadget", "npr", "abc", "cbs", 
+    "nbc", "fox", "usa today", "washington post", "new york times", 
+    "wall street journal", "time", "newsweek", "fortune", "forbes"
+]
+DIVERSE_SOURCES = CATEGORY_SOURCES + ["espn", "nfl", "nba", "nhl", "mlb", "nascar", "pga"]
+
+def _has_english_title(title: str) -> bool:
+    return bool(title) and any(char.isascii() and char.isalpha() for char in title)
+
+def _keep_sports(source_name: str, title: str) -> bool:
+    # More lenient filtering for sports - include more sources
+    return _has_english_title(title) and (
+        any(reputable in source_name for reputable in SPORTS_SOURCES) or
+        any(sport in source_name for sport in ["espn", "bleacher", "sporting", "cbs", "nbc", "fox", "sports", "athletic"]))
+
+def _keep_from(sources: List[str]) -> Callable[[str, str], bool]:
+    # Filter for reputable sources and English content
+    return lambda source_name, title: (
+        any(reputable in source_name for reputable in sources) and _has_english_title(title))
+
+def _newsapi_plan(key: str, country="us", page_size=50, category=None) -> List[Tuple[Dict, Callable[[str, str], bool]]]:
+    """The NewsAPI requests for one fetch, each with the source/title filter its results get."""
+    if category == "sports":
+        # Multiple approaches to get comprehensive sports coverage
+        sports_queries = [
+            # General sports category
+            {"apiKey": key, "country": country, "pageSize": 100, "category": "sports"},
+            # Sports-specific sources
+            {"apiKey": key, "sources": "espn,bleacher-report,sporting-news,cbssports,nbcsports", "pageSize": 50},
+            # Recent sports news with keywords
+            {"apiKey": key, "q": "playoffs OR championship OR game OR team OR player OR baseball OR football OR basketball", "pageSize": 50, "sortBy": "publishedAt"},
+            # MLB specific
+            {"apiKey": key, "q": "MLB OR baseball OR playoffs OR world series", "pageSize": 30, "sortBy": "publishedAt"},
+            # NFL specific  
+            {"apiKey": key, "q": "NFL OR football OR playoffs", "pageSize": 30, "sortBy": "publishedAt"},
+        ]
+        return [(params, _keep_sports) for params in sports_queries]
+    if category:
+        return [({"apiKey": key, "country": country, "pageSize": min(page_size, 50), "category": category},
+                 _keep_from(CATEGORY_SOURCES))]
+    # Fetch diverse categories
+    categories = ["technology", "sports", "business", "entertainment", "health"]
+    return [({"apiKey": key, "country": country, "pageSize": 5, "category": cat}, _keep_from(DIVERSE_SOURCES))
+            for cat in categories]
+
+def _parse_newsapi(data: Dict, keep: Callable[[str, str], bool]) -> List[Dict]:
+    out = []
+    for a in data.get("articles", []):
+        source_name = (a.get("source") or {}).get("name","").lower()
+        title = a.get("title","")
+        if keep(source_name, title):
+            out.append({
+                "url": a.get("url",""),
+                "title": title,
+                "source": (a.get("source") or {}).get("name",""),
+                "author": a.get("author") or "",
+                "published_at": a.get("publishedAt") or "",
+                "description": a.get("description") or "",
+                "content": a.get("content") or "",
+            })
+    return out
+
+def _newsapi_key() -> Optional[str]:
     key = os.getenv("NEWSAPI_KEY")
     print(f"NEWSAPI_KEY found: {bool(key)}")
     if not key: 
         print("No NEWSAPI_KEY found")
-        return []
-    
-    # Expanded reputable sources including sports-specific ones
-    reputable_sources = [
-        "bbc-news", "cnn", "reuters", "associated-press", "bloomberg", 
-        "business-insider", "engadget", "techcrunch", "wired", "the-verge",
-        "npr", "abc-news", "cbs-news", "nbc-news", "fox-news", "usa-today",
-        "the-washington-post", "the-new-york-times", "wall-street-journal",
-        "time", "newsweek", "fortune", "forbes", "wsj", "espn", "bleacher-report",
-        "sporting-news", "cbssports", "nbcsports", "foxsports", "the-athletic"
-    ]
-    
-    # Fetch news - either specific category or diverse categories
-    all_articles = []
-    
-    if category:
-        # For sports, fetch much more comprehensively
-        if category == "sports":
-            # Multiple approaches to get comprehensive sports coverage
-            sports_queries = [
-                # General sports category
-                {"apiKey": key, "country": country, "pageSize": 100, "category": "sports"},
-                # Sports-specific sources
-                {"apiKey": key, "sources": "espn,bleacher-report,sporting-news,cbssports,nbcsports", "pageSize": 50},
-                # Recent sports news with keywords
-                {"apiKey": key, "q": "playoffs OR championship OR game OR team OR player OR baseball OR football OR basketball", "pageSize": 50, "sortBy": "publishedAt"},
-                # MLB specific
-                {"apiKey": key, "q": "MLB OR baseball OR playoffs OR world series", "pageSize": 30, "sortBy": "publishedAt"},
-                # NFL specific  
-                {"apiKey": key, "q": "NFL OR football OR playoffs", "pageSize": 30, "sortBy": "publishedAt"},
-            ]
-            
-            for params in sports_queries:
-                try:
-                    r = requests.get(NEWSAPI, params=params, timeout=20, headers=USER_AGENT)
-                    r.raise_for_status()
-                    data = r.json()
-                    
-                    for a in data.get("articles", []):
-                        source_name = (a.get("source") or {}).get("name","").lower()
-                        title = a.get("title","")
-                        
-                        # More lenient filtering for sports - include more sources
-                        if (title and any(char.isascii() and char.isalpha() for char in title) and
-                            (any(reputable in source_name for reputable in reputable_sources) or 
-                             any(sport in source_name for sport in ["espn", "bleacher", "sporting", "cbs", "nbc", "fox", "sports", "athletic"]))):
-                            all_articles.append({
-                                "url": a.get("url",""),
-                                "title": title,
-                                "source": (a.get("source") or {}).get("name",""),
-                                "author": a.get("author") or "",
-                                "published_at": a.get("publishedAt") or "",
-                                "description": a.get("description") or "",
-                                "content": a.get("content") or "",
-                            })
-                except Exception as e:
-                    print(f"Error with sports query: {e}")
-                    continue
-        else:
-            # Other categories
-            try:
-                r = requests.get(NEWSAPI, params={
-                    "apiKey": key, 
-                    "country": country, 
-                    "pageSize": min(page_size, 50),
-                    "category": category
-                }, timeout=20, headers=USER_AGENT)
-                r.raise_for_status()
-                data = r.json()
-                
-                for a in data.get("articles", []):
-                    source_name = (a.get("source") or {}).get("name","").lower()
-                    title = a.get("title","")
-                    
-                    # Filter for reputable sources and English content
-                    if (any(reputable in source_name for reputable in ["bbc", "cnn", "reuters", "bloomberg", "techcrunch", 
-                                                                  "wired", "verge", "engadget", "npr", "abc", "cbs", 
-                                                                  "nbc", "fox", "usa today", "washington post", "new york times", 
-                                                                  "wall street journal", "time", "newsweek", "fortune", "forbes"]) 
-                        and title and any(char.isascii() and char.isalpha() for char in title)):
-                        all_articles.append({
-                            "url": a.get("url",""),
-                            "title": title,
-                            "source": (a.get("source") or {}).get("name",""),
-                            "author": a.get("author") or "",
-                            "published_at": a.get("publishedAt") or "",
-                            "description": a.get("description") or "",
-                            "content": a.get("content") or "",
-                        })
-            except Exception as e:
-                print(f"Error fetching {category} news: {e}")
-    else:
-        # Fetch diverse categories
-        categories = ["technology", "sports", "business", "entertainment", "health"]
-        
-        for cat in categories:
-            try:
-                r = requests.get(NEWSAPI, params={
-                    "apiKey": key, 
-                    "country": country, 
-                    "pageSize": 5,
-                    "category": cat
-                }, timeout=20, headers=USER_AGENT)
-                r.raise_for_status()
-                data = r.json()
-                
-                for a in data.get("articles", []):
-                    source_name = (a.get("source") or {}).get("name","").lower()
-                    title = a.get("title","")
-                    
-                    # Filter for reputable sources and English content
-                    if (any(reputable in source_name for reputable in ["bbc", "cnn", "reuters", "bloomberg", "techcrunch", 
-                                                                  "wired", "verge", "engadget", "npr", "abc", "cbs", 
-                                                                  "nbc", "fox", "usa today", "washington post", "new york times", 
-                                                                  "wall street journal", "time", "newsweek", "fortune", "forbes",
-                                                                  "espn", "nfl", "nba", "nhl", "mlb", "nascar", "pga"]) 
-                        and title and any(char.isascii() and char.isalpha() for char in title)):
-                        all_articles.append({
-                            "url": a.get("url",""),
-                            "title": title,
-                            "source": (a.get("source") or {}).get("name",""),
-                            "author": a.get("author") or "",
-                            "published_at": a.get("publishedAt") or "",
-                            "description": a.get("description") or "",
-                            "content": a.get("content") or "",
-                        })
-            except Exception as e:
-                print(f"Error fetching {cat} news: {e}")
-                continue
-    
-    return all_articles
+    return key
 
-def gdelt_fetch(query="technology", maxrecords=50) -> List[Dict]:
+def _gdelt_params(query: str, maxrecords: int, since: Optional[datetime] = None) -> Dict:
     # Simplified query for better results
     params = {
         "query": f"{query} language:english",  # Focus on English content
@@ -160,116 +112,210 @@ def gdelt_fetch(query="technology", maxrecords=50) -> List[Dict]:
         "maxrecords": maxrecords,
         "format": "JSON",
     }
-    
+    if since is not None:
+        # Incremental fetch: only articles GDELT saw after the caller's watermark (UTC)
+        params["startdatetime"] = since.astimezone(timezone.utc).strftime("%Y%m%d%H%M%S")
+    return params
+
+# Reputable English domains to filter for
+GDELT_DOMAINS = [
+    "bbc.com", "cnn.com", "reuters.com", "bloomberg.com", "techcrunch.com",
+    "wired.com", "theverge.com", "engadget.com", "npr.org", "abcnews.go.com",
+    "cbsnews.com", "nbcnews.com", "foxnews.com", "usatoday.com",
+    "washingtonpost.com", "nytimes.com", "wsj.com", "time.com", "newsweek.com",
+    "fortune.com", "forbes.com", "businessinsider.com", "ap.org"
+]
+
+def _parse_gdelt(data: Dict) -> List[Dict]:
+    out = []
+    for a in data.get("articles", []):
+        title = a.get("title", "")
+        domain = a.get("domain", "").lower()
+        
+        # Filter for reputable sources and English content
+        if _has_english_title(title) and any(reputable in domain for reputable in GDELT_DOMAINS):
+            out.append({
+                "url": a.get("url",""),
+                "title": title,
+                "source": a.get("domain",""),
+                "author": "",
+                "published_at": a.get("seendate",""),
+                "description": a.get("title",""),
+                "content": a.get("snippet",""),
+            })
+    return out
+
+# --- async fetchers ---------------------------------------------------------
+# One pooled keep-alive client per process; every upstream request goes through
+# a semaphore so a fan-out over many categories/queries stays bounded.
+
+_client: Optional["httpx.AsyncClient"] = None
+_limit: Optional[asyncio.Semaphore] = None
+
+def get_http_client() -> "httpx.AsyncClient":
+    global _client, _limit
+    if _client is None or _client.is_closed:
+        import httpx
+        _client = httpx.AsyncClient(
+            headers=USER_AGENT,
+            timeout=FETCH_TIMEOUT,
+            limits=httpx.Limits(max_connections=FETCH_CONCURRENCY, max_keepalive_connections=FETCH_CONCURRENCY),
+        )
+        _limit = asyncio.Semaphore(FETCH_CONCURRENCY)
+    return _client
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _query_label(params: Dict) -> str:
+    # Bounded label values for the metrics: the category, or the kind of query
+    if params.get("category"):
+        return params["category"]
+    if "sources" in params:
+        return "sources"
+    if "q" in params:
+        return "search"
+    return (params.get("query") or "").split(" ")[0] or "other"
+
+async def _get_json(url: str, params: Dict) -> Dict:
+    client = get_http_client()
+    api = "newsapi" if url == NEWSAPI else "gdelt"
     try:
-        r = requests.get(GDELT, params=params, timeout=20, headers=USER_AGENT)
+        async with _limit:
+            with fetch_seconds.time(api, _query_label(params)):
+                r = await client.get(url, params=params, timeout=FETCH_TIMEOUT)
         r.raise_for_status()
-        data = r.json()
-        
-        # Reputable English domains to filter for
-        reputable_domains = [
-            "bbc.com", "cnn.com", "reuters.com", "bloomberg.com", "techcrunch.com",
-            "wired.com", "theverge.com", "engadget.com", "npr.org", "abcnews.go.com",
-            "cbsnews.com", "nbcnews.com", "foxnews.com", "usatoday.com",
-            "washingtonpost.com", "nytimes.com", "wsj.com", "time.com", "newsweek.com",
-            "fortune.com", "forbes.com", "businessinsider.com", "ap.org"
-        ]
-        
-        out = []
-        for a in data.get("articles", []):
-            title = a.get("title", "")
-            domain = a.get("domain", "").lower()
-            
-            # Filter for reputable sources and English content
-            if (title and 
-                any(char.isascii() and char.isalpha() for char in title) and
-                any(reputable in domain for reputable in reputable_domains)):
-                
-                out.append({
-                    "url": a.get("url",""),
-                    "title": title,
-                    "source": a.get("domain",""),
-                    "author": "",
-                    "published_at": a.get("seendate",""),
-                    "description": a.get("title",""),
-                    "content": a.get("snippet",""),
-                })
-        return out
-        
+        return r.json()
+    except Exception:
+        fetch_errors.inc(api)
+        raise
+
+async def newsapi_fetch_async(country="us", page_size=50, category=None) -> List[Dict]:
+    """Top headlines for every query in the plan, run concurrently; failed queries are skipped."""
+    key = _newsapi_key()
+    if not key:
+        return []
+    plan = _newsapi_plan(key, country, page_size, category)
+    results = await asyncio.gather(*(_get_json(NEWSAPI, params) for params, _ in plan), return_exceptions=True)
+    all_articles = []
+    for (params, keep), data in zip(plan, results):
+        if isinstance(data, Exception):
+            print(f"Error fetching {category or params.get('category')} news: {data!r}")
+            continue
+        all_articles.extend(_parse_newsapi(data, keep))
+    return all_articles
+
+async def gdelt_fetch_async(query="technology", maxrecords=50, since: Optional[datetime] = None) -> List[Dict]:
+    try:
+        return _parse_gdelt(await _get_json(GDELT, _gdelt_params(query, maxrecords, since)))
     except Exception as e:
-        print(f"GDELT API error: {e}")
-        # Fallback with diverse sample English articles for demonstration
-        return [
-            {
-                "url": "https://techcrunch.com/2024/01/15/ai-breakthrough-announced/",
-                "title": "Major AI Breakthrough Announced by Leading Tech Company",
-                "source": "techcrunch.com",
-                "author": "Tech Reporter",
-                "published_at": "2024-01-15T10:00:00Z",
-                "description": "Revolutionary AI technology promises to transform industries",
-                "content": "A leading technology company has announced a breakthrough in artificial intelligence that could revolutionize multiple industries. The new system demonstrates unprecedented capabilities in natural language processing and machine learning.",
-            },
-            {
-                "url": "https://www.bbc.com/technology/2024/01/15/quantum-computing-milestone",
-                "title": "Quantum Computing Reaches New Milestone",
-                "source": "bbc.com",
-                "author": "BBC Technology",
-                "published_at": "2024-01-15T09:30:00Z",
-                "description": "Scientists achieve quantum supremacy in new experiment",
-                "content": "Researchers have achieved a new milestone in quantum computing, demonstrating quantum supremacy in a controlled laboratory environment. This breakthrough could accelerate drug discovery and cryptography.",
-            },
-            {
-                "url": "https://www.reuters.com/technology/2024/01/15/space-technology-advancement/",
-                "title": "Space Technology Advancement Enables New Missions",
-                "source": "reuters.com",
-                "author": "Reuters Staff",
-                "published_at": "2024-01-15T08:45:00Z",
-                "description": "New propulsion technology opens possibilities for deep space exploration",
-                "content": "A breakthrough in space propulsion technology has been announced, potentially enabling missions to Mars and beyond. The new system uses advanced ion engines for efficient long-distance travel.",
-            },
-            {
-                "url": "https://www.espn.com/nba/2024/01/15/lakers-victory-championship-race",
-                "title": "Lakers Secure Crucial Victory in Championship Race",
-                "source": "espn.com",
-                "author": "ESPN Staff",
-                "published_at": "2024-01-15T11:00:00Z",
-                "description": "Los Angeles Lakers defeat rivals in high-stakes basketball game",
-                "content": "The Los Angeles Lakers secured a crucial victory against their conference rivals, keeping their championship hopes alive. The game featured outstanding performances from key players and strategic coaching decisions.",
-            },
-            {
-                "url": "https://www.nfl.com/news/2024/01/15/super-bowl-predictions",
-                "title": "Super Bowl Predictions: Top Teams Battle for Championship",
-                "source": "nfl.com",
-                "author": "NFL Reporter",
-                "published_at": "2024-01-15T12:15:00Z",
-                "description": "Expert analysis of Super Bowl contenders and playoff scenarios",
-                "content": "As the NFL playoffs approach, experts are analyzing the top contenders for the Super Bowl. Several teams have emerged as strong candidates based on their regular season performance and playoff experience.",
-            },
-            {
-                "url": "https://www.bbc.com/sport/2024/01/15/olympics-preparation",
-                "title": "Olympic Athletes Prepare for Paris 2024 Games",
-                "source": "bbc.com",
-                "author": "BBC Sport",
-                "published_at": "2024-01-15T13:30:00Z",
-                "description": "Athletes worldwide intensify training for upcoming Olympic Games",
-                "content": "Olympic athletes from around the world are ramping up their training programs in preparation for the Paris 2024 Olympic Games. The competition promises to showcase the world's best athletic talent across multiple sports disciplines.",
-            },
-            {
-                "url": "https://www.cnn.com/business/2024/01/15/stock-market-rally",
-                "title": "Stock Market Rally Continues Amid Economic Optimism",
-                "source": "cnn.com",
-                "author": "CNN Business",
-                "published_at": "2024-01-15T14:00:00Z",
-                "description": "Major indices post gains as investors show renewed confidence",
-                "content": "The stock market continued its upward trajectory as major indices posted significant gains. Economic indicators suggest growing investor confidence and positive outlook for the coming quarters.",
-            },
-            {
-                "url": "https://www.bloomberg.com/news/2024/01/15/cryptocurrency-regulation",
-                "title": "New Cryptocurrency Regulations Take Effect",
-                "source": "bloomberg.com",
-                "author": "Bloomberg News",
-                "published_at": "2024-01-15T15:45:00Z",
-                "description": "Government implements comprehensive crypto trading rules",
-                "content": "New cryptocurrency regulations have come into effect, establishing comprehensive guidelines for digital asset trading and investment. The rules aim to provide greater protection for investors while fostering innovation in the blockchain space.",
-            }
-        ]
+        print(f"GDELT API error: {e!r}")
+        return [dict(a) for a in GDELT_SAMPLE_ARTICLES]
+
+async def fetch_category_async(category: str, page_size: int, maxrecords: int,
+                               since: Optional[datetime] = None) -> List[Dict]:
+    """NewsAPI for one category, falling back to GDELT when it returns nothing.
+
+    ``since`` is passed to GDELT; NewsAPI top-headlines has no time filter, so
+    callers tracking a watermark still filter its items themselves.
+    """
+    try:
+        return (await newsapi_fetch_async(category=category, page_size=page_size)
+                or await gdelt_fetch_async(query=category, maxrecords=maxrecords, since=since))
+    except Exception as e:
+        print(f"Error fetching {category}: {e!r}")
+        return []
+
+async def fetch_categories_async(categories: List[str], sizes: Callable[[str], Tuple[int, int]]) -> AsyncIterator[Dict]:
+    """Fetch all categories concurrently; ``sizes(category)`` gives (page_size, maxrecords).
+
+    Yields each category's items as soon as its fetch finishes, so ingest can start on
+    the first one while the rest are still in flight.
+    """
+    tasks = [asyncio.ensure_future(fetch_category_async(c, *sizes(c))) for c in categories]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            for it in await fut:
+                yield it
+    finally:
+        for t in tasks:
+            t.cancel()
+
+# Fallback with diverse sample English articles for demonstration
+GDELT_SAMPLE_ARTICLES = [
+    {
+        "url": "https://techcrunch.com/2024/01/15/ai-breakthrough-announced/",
+        "title": "Major AI Breakthrough Announced by Leading Tech Company",
+        "source": "techcrunch.com",
+        "author": "Tech Reporter",
+        "published_at": "2024-01-15T10:00:00Z",
+        "description": "Revolutionary AI technology promises to transform industries",
+        "content": "A leading technology company has announced a breakthrough in artificial intelligence that could revolutionize multiple industries. The new system demonstrates unprecedented capabilities in natural language processing and machine learning.",
+    },
+    {
+        "url": "https://www.bbc.com/technology/2024/01/15/quantum-computing-milestone",
+        "title": "Quantum Computing Reaches New Milestone",
+        "source": "bbc.com",
+        "author": "BBC Technology",
+        "published_at": "2024-01-15T09:30:00Z",
+        "description": "Scientists achieve quantum supremacy in new experiment",
+        "content": "Researchers have achieved a new milestone in quantum computing, demonstrating quantum supremacy in a controlled laboratory environment. This breakthrough could accelerate drug discovery and cryptography.",
+    },
+    {
+        "url": "https://www.reuters.com/technology/2024/01/15/space-technology-advancement/",
+        "title": "Space Technology Advancement Enables New Missions",
+        "source": "reuters.com",
+        "author": "Reuters Staff",
+        "published_at": "2024-01-15T08:45:00Z",
+        "description": "New propulsion technology opens possibilities for deep space exploration",
+        "content": "A breakthrough in space propulsion technology has been announced, potentially enabling missions to Mars and beyond. The new system uses advanced ion engines for efficient long-distance travel.",
+    },
+    {
+        "url": "https://www.espn.com/nba/2024/01/15/lakers-victory-championship-race",
+        "title": "Lakers Secure Crucial Victory in Championship Race",
+        "source": "espn.com",
+        "author": "ESPN Staff",
+        "published_at": "2024-01-15T11:00:00Z",
+        "description": "Los Angeles Lakers defeat rivals in high-stakes basketball game",
+        "content": "The Los Angeles Lakers secured a crucial victory against their conference rivals, keeping their championship hopes alive. The game featured outstanding performances from key players and strategic coaching decisions.",
+    },
+    {
+        "url": "https://www.nfl.com/news/2024/01/15/super-bowl-predictions",
+        "title": "Super Bowl Predictions: Top Teams Battle for Championship",
+        "source": "nfl.com",
+        "author": "NFL Reporter",
+        "published_at": "2024-01-15T12:15:00Z",
+        "description": "Expert analysis of Super Bowl contenders and playoff scenarios",
+        "content": "As the NFL playoffs approach, experts are analyzing the top contenders for the Super Bowl. Several teams have emerged as strong candidates based on their regular season performance and playoff experience.",
+    },
+    {
+        "url": "https://www.bbc.com/sport/2024/01/15/olympics-preparation",
+        "title": "Olympic Athletes Prepare for Paris 2024 Games",
+        "source": "bbc.com",
+        "author": "BBC Sport",
+        "published_at": "2024-01-15T13:30:00Z",
+        "description": "Athletes worldwide intensify training for upcoming Olympic Games",
+        "content": "Olympic athletes from around the world are ramping up their training programs in preparation for the Paris 2024 Olympic Games. The competition promises to showcase the world's best athletic talent across multiple sports disciplines.",
+    },
+    {
+        "url": "https://www.cnn.com/business/2024/01/15/stock-market-rally",
+        "title": "Stock Market Rally Continues Amid Economic Optimism",
+        "source": "cnn.com",
+        "author": "CNN Business",
+        "published_at": "2024-01-15T14:00:00Z",
+        "description": "Major indices post gains as investors show renewed confidence",
+        "content": "The stock market continued its upward trajectory as major indices posted significant gains. Economic indicators suggest growing investor confidence and positive outlook for the coming quarters.",
+    },
+    {
+        "url": "https://www.bloomberg.com/news/2024/01/15/cryptocurrency-regulation",
+        "title": "New Cryptocurrency Regulations Take Effect",
+        "source": "bloomberg.com",
+        "author": "Bloomberg News",
+        "published_at": "2024-01-15T15:45:00Z",
+        "description": "Government implements comprehensive crypto trading rules",
+        "content": "New cryptocurrency regulations have come into effect, establishing comprehensive guidelines for digital asset trading and investment. The rules aim to provide greater protection for investors while fostering innovation in the blockchain space.",
+    }
+]
@@ -0,0 +1,211 @@
+import asyncio, os
+from contextlib import aclosing
+from datetime import timedelta
+from typing import AsyncIterable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .db import ReadSessionLocal
+from .models import Article
+from .summarize import llm_summary_async, SUMMARY_CONCURRENCY
+from .embeddings import embed_texts_cached, dumps_embedding
+from .features import features_for
+from .dates import parse_published_at, utcnow
+from .ann_index import active_index
+from .result_cache import bump_corpus_version
+from .feeds import MATERIALIZED, fan_out
+from .pipeline import aiter_items, batched, stage, unbatched
+from .near_dup import NEAR_DUP_DETECTION, near_dups, simhash
+from .metrics import db_commit_seconds, ingested_items
+
+# SQLite caps bound parameters per statement; stay well under it
+CHUNK_SIZE = 500
+# Pipeline tuning: items per existence check / insert+commit, concurrent summaries, embedding workers
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "50"))
+INGEST_SUMMARY_WORKERS = int(os.getenv("INGEST_SUMMARY_WORKERS", str(SUMMARY_CONCURRENCY)))
+INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "1"))
+
+# Query parameters that only track the click: any utm_* plus these exact names
+_TRACKING_PREFIX = "utm_"
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid"}
+
+def _tracking(param: str) -> bool:
+    param = param.lower()
+    return param.startswith(_TRACKING_PREFIX) or param in _TRACKING_PARAMS
+
+def normalize_url(url: str) -> str:
+    """Dedup key for a URL (stored as url_key; the URL itself is stored as given): lowercase
+    scheme/host, no fragment, tracking params or trailing slash."""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _tracking(k)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+def _chunks(seq: List, size: int = CHUNK_SIZE):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+async def existing_urls(session: AsyncSession, urls: Iterable[str]) -> set:
+    """Which of ``urls`` are already stored, as a url or a url_key, resolved with one IN
+    query per chunk."""
+    urls = list(set(urls))
+    found = set()
+    for chunk in _chunks(urls):
+        res = await session.execute(
+            select(Article.url, Article.url_key).where(or_(Article.url.in_(chunk), Article.url_key.in_(chunk)))
+        )
+        for r in res.all():
+            found.update((r.url, r.url_key))
+    return found
+
+def item_text(it: Dict) -> str:
+    return " ".join(filter(None, [it["title"], it["description"], it["content"]]))
+
+def build_row(it: Dict, summary: Optional[str], emb: Optional[List[float]] = None) -> Dict:
+    row = dict(
+        url=it["url"], url_key=it.get("url_key"), title=it["title"], source=it["source"], author=it["author"],
+        published_at=it["published_at"], description=it["description"], content=it["content"],
+        canonical_url=it.get("canonical_url"),
+    )
+    if row["canonical_url"]:
+        # Near-duplicates are kept for URL dedup and clustering; the canonical copy carries the rest
+        return {**row, "summary": None, "embedding": None, "keyword_features": None}
+    return {**row, "summary": summary, "embedding": dumps_embedding(emb) if emb else None,
+            "keyword_features": features_for(it["title"], it["description"], it["content"])}
+
+def build_rows(batch: List[Tuple[Dict, Optional[str]]]) -> List[Dict]:
+    """Rows for (item, summary) pairs; the embedder runs once for the whole batch."""
+    texts = [item_text(it) for it, _ in batch]
+    todo = [i for i, (it, _) in enumerate(batch) if texts[i] and not it.get("canonical_url")]
+    embs = dict(zip(todo, embed_texts_cached([texts[i] for i in todo])))
+    return [build_row(it, summary, embs.get(i)) for i, (it, summary) in enumerate(batch)]
+
+async def insert_rows(session: AsyncSession, rows: List[Dict]) -> List[Article]:
+    """Batched INSERT ... ON CONFLICT DO NOTHING (on url or url_key); returns the rows that were
+    actually written."""
+    written = []
+    for chunk in _chunks(rows):
+        stmt = sqlite_insert(Article).on_conflict_do_nothing()
+        res = await session.execute(stmt.returning(Article.id, Article.url), chunk)
+        ids = {r.url: r.id for r in res.all()}
+        written.extend(Article(id=ids[r["url"]], **r) for r in chunk if r["url"] in ids)
+    return written
+
+async def ingest_items(session: AsyncSession, items: Union[Iterable[Dict], AsyncIterable[Dict]],
+                       max_age: Optional[timedelta] = None,
+                       progress: Optional[Callable[..., None]] = None) -> Dict[str, int]:
+    """Shared ingest path, run as a streaming pipeline:
+    validate/normalize -> age filter -> dedup (URL, then near-duplicate text) -> summarize
+    -> embed -> batched insert.
+
+    ``items`` may be an async iterable, so fetching overlaps with the rest and early
+    batches are committed while later ones are still arriving. ``session`` is only used
+    for the writes; lookups go through the read pool. Queues between stages are bounded,
+    so memory does not grow with the number of items upstream returns.
+    Returns per-stage counts; ``progress(stage, **counts)`` is called as work moves
+    through the stages (see jobs.Job.update).
+    """
+    progress = progress or (lambda stage, **counts: None)
+    stats = {"fetched": 0, "invalid": 0, "duplicate": 0, "too_old": 0, "existing": 0, "near_duplicate": 0,
+             "summarized": 0, "inserted": 0}
+    cutoff = utcnow() - max_age if max_age is not None else None
+    seen = set()
+    inflight: Dict[str, asyncio.Future] = {}
+    provisional: Dict[str, int] = {}  # url -> simhash added to near_dups but not yet stored
+
+    async def normalized():
+        async for it in aiter_items(items):
+            stats["fetched"] += 1
+            if not it["url"] or not it["title"]:
+                stats["invalid"] += 1
+                continue
+            url, key = it["url"].strip(), normalize_url(it["url"])
+            if key in seen:
+                stats["duplicate"] += 1
+                continue
+            seen.add(key)
+            # Parsed once here; stored as an indexed UTC datetime
+            published_at = parse_published_at(it["published_at"])
+            # Only add articles newer than max_age; unparseable dates are skipped to be safe
+            if cutoff is not None and it["published_at"] and (published_at is None or published_at < cutoff):
+                stats["too_old"] += 1
+                continue
+            yield {**it, "url": url, "url_key": key, "published_at": published_at}
+
+    async def new_only(batch: List[Dict]) -> Optional[List[Dict]]:
+        # Rows stored before url_key existed only have a url (some normalized), so check both
+        # Reads go through the read pool: ``session`` (the single writer connection) is only
+        # held for the short insert+commit of each batch, not while this batch is summarized
+        async with ReadSessionLocal() as reader:
+            known = await existing_urls(reader, [it["url"] for it in batch] + [it["url_key"] for it in batch])
+            if NEAR_DUP_DETECTION:
+                await near_dups.ensure_loaded(reader)
+        fresh = [it for it in batch if it["url"] not in known and it["url_key"] not in known]
+        stats["existing"] += len(batch) - len(fresh)
+        if NEAR_DUP_DETECTION:
+            # Syndicated copies skip summarizing/embedding and point at the first copy seen
+            for it in fresh:
+                h = simhash(it["title"], it["description"])
+                canonical = near_dups.match(h)
+                if canonical is None:
+                    # Indexed now so the rest of this ingest sees it; withdrawn below unless stored
+                    near_dups.add(h, it["url"])
+                    provisional[it["url"]] = h
+                else:
+                    it["canonical_url"] = canonical
+                    stats["near_duplicate"] += 1
+        progress("summarize", **stats)
+        return fresh or None
+
+    async def summarize(it: Dict):
+        if it.get("canonical_url"):
+            return it, None
+        # The same wire story under several URLs costs one LLM request while it is in flight
+        text = item_text(it)
+        pending = inflight.get(text)
+        if pending is None:
+            pending = inflight[text] = asyncio.ensure_future(llm_summary_async(text))
+            pending.add_done_callback(lambda _: inflight.pop(text, None))
+        summary = await asyncio.shield(pending)
+        stats["summarized"] += 1
+        return it, summary
+
+    async def embed(batch: List[Tuple[Dict, str]]) -> List[Dict]:
+        return await asyncio.to_thread(build_rows, batch)
+
+    # Queues of whole batches are kept short so the bound on items in flight stays small
+    checked = stage(new_only, batched(normalized(), INGEST_BATCH_SIZE), maxsize=2)
+    summarized = stage(summarize, unbatched(checked), workers=INGEST_SUMMARY_WORKERS)
+    rows = stage(embed, batched(summarized, INGEST_BATCH_SIZE, maxsize=INGEST_BATCH_SIZE), workers=INGEST_EMBED_WORKERS, maxsize=2)
+    try:
+        async with aclosing(rows):
+            async for batch in rows:
+                written = await insert_rows(session, batch)
+                with db_commit_seconds.time():
+                    await session.commit()
+                stats["existing"] += len(batch) - len(written)
+                stats["inserted"] += len(written)
+                stored = {a.url for a in written}
+                for row in batch:
+                    h = provisional.pop(row["url"], None)
+                    if h is not None and row["url"] not in stored:
+                        near_dups.remove(h, row["url"])  # lost ON CONFLICT to a row stored meanwhile
+                if written:
+                    bump_corpus_version()
+                    await active_index().add_articles(written)
+                    if MATERIALIZED:
+                        await fan_out(session, written)
+                        await session.commit()
+                progress("write", **stats)
+    finally:
+        # Stories that never made it into the table (failed insert, aborted ingest) mustn't
+        # mark later copies as duplicates
+        for url, h in provisional.items():
+            near_dups.remove(h, url)
+
+    progress("done", **stats)
+    for outcome, n in stats.items():
+        ingested_items.inc(outcome, amount=n)
+    print(f"Ingest stages: {stats}")
+    return stats
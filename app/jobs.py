@@ -0,0 +1,104 @@
+import asyncio, os, uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from .dates import utcnow
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs kept around for polling
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "1000"))
+
+class Job:
+    """A queued unit of background work, polled via GET /jobs/{id}."""
+
+    def __init__(self, key: str, fn: Callable[["Job"], Awaitable[Any]]):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.fn = fn
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    def update(self, stage: str, **progress):
+        self.stage = stage
+        self.progress.update(progress)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "key": self.key, "status": self.status, "stage": self.stage,
+            "progress": self.progress, "result": self.result, "error": self.error,
+            "created_at": self.created_at, "started_at": self.started_at, "finished_at": self.finished_at,
+        }
+
+class JobQueue:
+    """Worker pool over an asyncio queue; submitting a key that is already queued/running
+    returns the existing job instead of starting another."""
+
+    def __init__(self, workers: int = JOB_WORKERS, history: int = JOB_HISTORY):
+        self.workers = workers
+        self.history = history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if not self._tasks:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, key: str, fn: Callable[[Job], Awaitable[Any]]) -> Job:
+        job = self._active.get(key)
+        if job is not None:
+            return job
+        self.start()
+        job = Job(key, fn)
+        self._active[key] = job
+        self._jobs[job.id] = job
+        self._trim()
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _trim(self):
+        finished = [jid for jid, j in self._jobs.items() if not j.active]
+        for jid in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[jid]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status, job.started_at = "running", utcnow()
+            try:
+                job.result = await job.fn(job)
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status, job.error = "failed", "cancelled"
+                raise
+            except Exception as e:
+                print(f"Job {job.key} failed: {e!r}")
+                job.status, job.error = "failed", repr(e)
+            finally:
+                job.finished_at = utcnow()
+                self._active.pop(job.key, None)
+                job.done.set()
+                self._queue.task_done()
+
+job_queue = JobQueue()
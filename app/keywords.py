@@ -0,0 +1,144 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Interests that switch on a keyword category, and the keywords that category scores.
+# Lists are kept verbatim (including repeats) so weights match the original scan exactly.
+CATEGORY_TRIGGERS: Dict[str, List[str]] = {
+    "technology": ["technology", "ai", "tech", "apple", "google", "microsoft", "computer", "software"],
+    "sports": ["sports", "football", "basketball", "soccer", "baseball", "tennis", "golf"],
+    "business": ["business", "finance", "economy", "market", "stock", "money", "investment"],
+    "health": ["health", "science", "medical", "medicine", "research"],
+    "entertainment": ["entertainment", "movie", "music", "celebrity", "hollywood"],
+}
+
+CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "technology": [
+        "ai", "artificial intelligence", "machine learning", "neural network", "algorithm",
+        "apple", "google", "microsoft", "amazon", "meta", "facebook", "tesla", "openai",
+        "tech", "technology", "software", "computer", "digital", "innovation", "startup",
+        "chip", "semiconductor", "cpu", "gpu", "processor", "intel", "nvidia", "amd",
+        "smartphone", "iphone", "android", "app", "application", "programming", "code",
+        "cybersecurity", "hacking", "data", "cloud", "server", "database", "internet",
+        "automation", "robot", "drone", "electric", "battery", "solar", "renewable",
+        "crypto", "bitcoin", "blockchain", "nft", "web3", "metaverse", "vr", "ar"
+    ],
+    "sports": [
+        "nfl", "nba", "nhl", "mlb", "nascar", "pga", "tennis", "golf", "soccer", "football",
+        "basketball", "baseball", "hockey", "racing", "olympics", "championship", "playoff",
+        "panthers", "lakers", "warriors", "cowboys", "patriots", "yankees", "dodgers",
+        "game", "team", "player", "coach", "season", "score", "win", "loss", "victory",
+        "stadium", "arena", "field", "court", "track", "gym", "training", "fitness"
+    ],
+    "business": [
+        "business", "finance", "economy", "market", "stock", "investment", "trading",
+        "company", "corporate", "financial", "bank", "banking", "loan", "credit",
+        "revenue", "profit", "loss", "earnings", "quarterly", "ipo", "merger", "acquisition",
+        "ceo", "executive", "board", "shareholder", "dividend", "portfolio", "fund",
+        "startup", "venture", "capital", "funding", "valuation", "unicorn", "ipo"
+    ],
+    "health": [
+        "health", "medical", "medicine", "doctor", "hospital", "patient", "treatment",
+        "research", "study", "clinical", "trial", "vaccine", "drug", "therapy",
+        "cancer", "diabetes", "heart", "brain", "mental", "psychology", "therapy",
+        "fitness", "exercise", "nutrition", "diet", "wellness", "lifestyle"
+    ],
+    "entertainment": [
+        "movie", "film", "cinema", "hollywood", "actor", "actress", "director", "producer",
+        "music", "song", "album", "artist", "singer", "band", "concert", "tour",
+        "celebrity", "famous", "star", "award", "oscar", "grammy", "emmy", "golden globe",
+        "netflix", "disney", "hbo", "streaming", "tv", "television", "series", "show"
+    ],
+}
+
+INTEREST_WEIGHT = 3.0
+KEYWORD_WEIGHT = 2.0
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    # Nested trie regex: at any position it matches the longest keyword starting there.
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node: Dict) -> str:
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+class KeywordMatcher:
+    """Substring matcher over a fixed keyword set that scans each text once.
+
+    Keywords without whitespace can only sit inside one token, so the text is
+    split once and each distinct token is resolved (and memoized) to the
+    keywords it contains. Multi-word keywords are still checked with ``in``.
+    """
+
+    max_cached_tokens = 100_000
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = {k: w for k, w in weights.items() if k}
+        words = sorted(self.weights)
+        self._phrases = [k for k in words if any(ch.isspace() for ch in k)]
+        single = [k for k in words if k not in self._phrases]
+        self._prefixes = {k: tuple(p for p in single if k.startswith(p)) for k in single}
+        self._pattern = re.compile("(?=(" + _trie_pattern(single) + "))") if single else None
+        self._token_hits: Dict[str, Tuple[str, ...]] = {}
+
+    def _scan(self, token: str) -> Tuple[str, ...]:
+        found: Set[str] = set()
+        if self._pattern is not None:
+            for longest in self._pattern.findall(token):
+                if longest:
+                    found.update(self._prefixes[longest])
+        return tuple(found)
+
+    def hits(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        cache = self._token_hits
+        for token in set(text.split()):
+            token_hits = cache.get(token)
+            if token_hits is None:
+                token_hits = self._scan(token)
+                if len(cache) < self.max_cached_tokens:
+                    cache[token] = token_hits
+            if token_hits:
+                found.update(token_hits)
+        for phrase in self._phrases:
+            if phrase in text:
+                found.add(phrase)
+        return found
+
+    def score(self, text: str) -> float:
+        weights = self.weights
+        return sum(weights[k] for k in self.hits(text))
+
+def enabled_categories(interests: Iterable[str]) -> List[str]:
+    interests = list(interests)
+    return [cat for cat, triggers in CATEGORY_TRIGGERS.items()
+            if any(t in interests for t in triggers)]
+
+def profile_weights(interests: Iterable[str]) -> Dict[str, float]:
+    """Per-keyword weight for a profile, summed over every list the keyword appears in."""
+    interests = list(interests)
+    weights: Dict[str, float] = {}
+    for interest in interests:
+        weights[interest] = weights.get(interest, 0.0) + INTEREST_WEIGHT
+    for cat in enabled_categories(interests):
+        for kw in CATEGORY_KEYWORDS[cat]:
+            weights[kw] = weights.get(kw, 0.0) + KEYWORD_WEIGHT
+    return weights
+
+@lru_cache(maxsize=64)
+def _matcher(interests: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(profile_weights(interests))
+
+def matcher_for(interests: Iterable[str]) -> KeywordMatcher:
+    # Order does not affect the weights, so sort to share cache entries
+    return _matcher(tuple(sorted(interests)))
@@ -1,59 +1,87 @@
-import asyncio, json, os
-from typing import List
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy import select
+import asyncio, importlib, json, os
+from datetime import timedelta
+from typing import List, Optional
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from dotenv import load_dotenv
-from .db import engine, Base, SessionLocal
-from .models import Article, UserProfile
-from .schemas import ArticleOut, UserProfileIn
-from .fetch_news import newsapi_fetch, gdelt_fetch
-from .summarize import llm_summary
-from .embeddings import embed_text, dumps_embedding
-from .reco import recommend_for
-
-# Load environment variables
-load_dotenv()
+from .db import ReadSessionLocal, SessionLocal, init_db
+from .models import Article, FeedItem, UserFeed, UserProfile
+from .schemas import ArticleOut, BatchRecommendationsIn, SearchResultOut, UserProfileIn
+from .fetch_news import newsapi_fetch_async, gdelt_fetch_async, fetch_category_async, fetch_categories_async, close_http_client
+from .ingest import ingest_items
+from .reco import recommend_batch, recommend_page
+from .search import search
+from .cache import cache_stats
+from .result_cache import result_cache, bump_profile_version
+from .scheduler import scheduler, INGEST_SCHEDULER
+from .jobs import Job, job_queue
+from .embeddings import embed_texts
+from .ann_index import active_index
+from .near_dup import NEAR_DUP_DETECTION, near_dups
+from .feature_store import FEATURE_STORE, feature_store
+from .feeds import MATERIALIZED, read_feed, rebuild_feed
+from . import metrics
+
+# WARMUP=1 pays the one-off costs (embedding model, OpenAI/httpx imports, in-memory indexes)
+# in the background right after startup instead of on the first requests
+WARMUP = os.getenv("WARMUP", "0") == "1"
 
 app = FastAPI(title="News Aggregator")
 
+# Request latency histogram, plus a Server-Timing breakdown for requests sending "X-Timing: 1"
+app.add_middleware(metrics.TimingMiddleware)
+
 async def get_db():
     async with SessionLocal() as session:
         yield session
 
+async def get_read_db():
+    # Read-only pool: never waits behind the single writer connection
+    async with ReadSessionLocal() as session:
+        yield session
+
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await init_db()
+    job_queue.start()
+    if INGEST_SCHEDULER:
+        scheduler.start()
+    if FEATURE_STORE:
+        feature_store.start()
+    if WARMUP:
+        app.state.warm_up = asyncio.create_task(warm_up())
+
+async def warm_up():
+    try:
+        await asyncio.to_thread(embed_texts, ["warm up"])
+        for module in ("openai", "httpx"):
+            await asyncio.to_thread(importlib.import_module, module)
+        async with ReadSessionLocal() as session:
+            await active_index().ensure_loaded(session)
+            if NEAR_DUP_DETECTION:
+                await near_dups.ensure_loaded(session)
+        print("Warm-up done")
+    except Exception as e:
+        print(f"Warm-up failed: {e!r}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    await scheduler.stop()
+    await feature_store.stop()
+    await job_queue.stop()
+    await close_http_client()
 
 @app.post("/ingest", response_model=int)
 async def ingest_news(session: AsyncSession = Depends(get_db), query: str = "technology"):
     # Try NewsAPI first, then fallback to GDELT
-    items = newsapi_fetch() or gdelt_fetch(query=query, maxrecords=30)
-    count = 0
-    for it in items:
-        if not it["url"] or not it["title"]:
-            continue
-        exists = await session.execute(select(Article).where(Article.url == it["url"]))
-        if exists.scalar_one_or_none(): 
-            continue
-        text = " ".join(filter(None, [it["title"], it["description"], it["content"]]))
-        summary = llm_summary(text) if text else ""
-        emb = embed_text(text) if text else []
-        a = Article(
-            url=it["url"], title=it["title"], source=it["source"], author=it["author"],
-            published_at=it["published_at"], description=it["description"], content=it["content"],
-            summary=summary, embedding=dumps_embedding(emb) if emb else None
-        )
-        session.add(a); count += 1
-    await session.commit()
-    return count
+    items = await newsapi_fetch_async() or await gdelt_fetch_async(query=query, maxrecords=30)
+    stats = await ingest_items(session, items)
+    return stats["inserted"]
 
 @app.post("/ingest-for-interests", response_model=dict)
-async def ingest_for_interests(interests: List[str], session: AsyncSession = Depends(get_db)):
-    """Fetch articles specifically tailored to user interests"""
-    from .fetch_news import newsapi_fetch, gdelt_fetch
-    
+async def ingest_for_interests(interests: List[str]):
+    """Queue fetches of articles tailored to user interests; poll GET /jobs/{job_id} for each"""
     # Map interests to NewsAPI categories
     category_map = {
         "sports": "sports",
@@ -73,47 +101,31 @@ async def ingest_for_interests(interests: List[str], session: AsyncSession = Dep
     }
     
     # Get unique categories for these interests
-    categories = list(set([category_map.get(interest.lower(), "general") for interest in interests]))
+    categories = sorted(set([category_map.get(interest.lower(), "general") for interest in interests]))
     
-    all_items = []
-    for category in categories:
-        try:
-            # Fetch more articles for each category - much more for sports
-            if category == "sports":
-                items = newsapi_fetch(category=category, page_size=100) or gdelt_fetch(query=category, maxrecords=50)
-            else:
-                items = newsapi_fetch(category=category, page_size=30) or gdelt_fetch(query=category, maxrecords=20)
-            all_items.extend(items)
-        except Exception as e:
-            print(f"Error fetching {category}: {e}")
-            continue
-    
-    # Remove duplicates and add to database
-    seen_urls = set()
-    count = 0
-    for it in all_items:
-        if not it["url"] or not it["title"] or it["url"] in seen_urls:
-            continue
-        seen_urls.add(it["url"])
-        
-        # Check if already exists
-        exists = await session.execute(select(Article).where(Article.url == it["url"]))
-        if exists.scalar_one_or_none(): 
-            continue
-            
-        text = " ".join(filter(None, [it["title"], it["description"], it["content"]]))
-        summary = llm_summary(text) if text else ""
-        emb = embed_text(text) if text else []
-        a = Article(
-            url=it["url"], title=it["title"], source=it["source"], author=it["author"],
-            published_at=it["published_at"], description=it["description"], content=it["content"],
-            summary=summary, embedding=dumps_embedding(emb) if emb else None
-        )
-        session.add(a)
-        count += 1
-    
-    await session.commit()
-    return {"ingested": count, "categories": categories}
+    # One job per category, so concurrent requests for the same category share it
+    jobs = {category: job_queue.submit(f"category:{category}", _category_job(category)) for category in categories}
+    return {"job_ids": [job.id for job in jobs.values()], "categories": categories,
+            "jobs": {category: job.id for category, job in jobs.items()}}
+
+def _category_job(category: str):
+    async def run(job: Job):
+        # Fetch more articles for each category - much more for sports
+        page_size, maxrecords = (100, 50) if category == "sports" else (30, 20)
+        job.update("fetch")
+        items = await fetch_category_async(category, page_size, maxrecords)
+        async with SessionLocal() as session:
+            stats = await ingest_items(session, items, progress=job.update)
+        return {"ingested": stats["inserted"], "stages": stats}
+    return run
+
+@app.get("/jobs/{job_id}", response_model=dict)
+async def get_job(job_id: str):
+    """Status, current stage and (once done) result of an ingest job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job.to_dict()
 
 @app.post("/profile", response_model=dict)
 async def set_profile(p: UserProfileIn, session: AsyncSession = Depends(get_db)):
@@ -125,80 +137,103 @@ async def set_profile(p: UserProfileIn, session: AsyncSession = Depends(get_db))
     else:
         row = UserProfile(user_id=p.user_id, interests=interests)
         session.add(row)
+    if MATERIALIZED:
+        # Drop the old feed with the old interests; reads rank on read until the rebuild is done
+        await session.execute(delete(FeedItem).where(FeedItem.user_id == p.user_id))
+        await session.execute(delete(UserFeed).where(UserFeed.user_id == p.user_id))
     await session.commit()
+    bump_profile_version(p.user_id)
+    if MATERIALIZED:
+        job_queue.submit(f"feed:{p.user_id}", _feed_job(p.user_id))
     return {"ok": True}
 
 @app.get("/recommendations", response_model=List[ArticleOut])
-async def get_recs(user_id: str, k: int = 10, session: AsyncSession = Depends(get_db)):
-    recs = await recommend_for(session, user_id=user_id, k=k)
+async def get_recs(user_id: str, response: Response, k: int = Query(10, ge=1, le=100), rank_by: str = "keywords",
+                   cursor: Optional[str] = None, session: AsyncSession = Depends(get_read_db)):
+    """One page of the feed; the next page is at ``cursor=<X-Next-Cursor header>``."""
+    if rank_by not in ("keywords", "embedding"):
+        raise HTTPException(status_code=400, detail="rank_by must be 'keywords' or 'embedding'")
+    key = result_cache.key(user_id, (k, rank_by, cursor))
+    cached = result_cache.get(key)
+    if cached is not None:
+        ids, next_cursor = cached
+        res = await session.execute(select(Article).where(Article.id.in_(ids)))
+        by_id = {a.id: a for a in res.scalars().all()}
+        recs = [by_id[i] for i in ids if i in by_id]
+    else:
+        try:
+            page = None
+            if MATERIALIZED and rank_by == "keywords":
+                page, rebuild = await read_feed(session, user_id, k=k, cursor=cursor)
+                if rebuild:
+                    job_queue.submit(f"feed:{user_id}", _feed_job(user_id))
+            recs, next_cursor = page or await recommend_page(session, user_id=user_id, k=k, rank_by=rank_by, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        result_cache.put(key, ([a.id for a in recs], next_cursor))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return recs
 
+def _feed_job(user_id: str):
+    async def run(job: Job):
+        job.update("rebuild")
+        async with SessionLocal() as session:
+            return {"feed_size": await rebuild_feed(session, user_id)}
+    return run
+
+@app.post("/recommendations/batch")
+async def batch_recs(req: BatchRecommendationsIn):
+    """First pages for many users (e.g. morning digests), streamed as one JSON line per user:
+    {"user_id": ..., "articles": [...]}"""
+    if req.rank_by not in ("keywords", "embedding"):
+        raise HTTPException(status_code=400, detail="rank_by must be 'keywords' or 'embedding'")
+
+    async def lines():
+        async with ReadSessionLocal() as session:
+            async for user_id, recs in recommend_batch(session, req.user_ids, k=req.k, rank_by=req.rank_by):
+                articles = [ArticleOut.model_validate(a).model_dump(mode="json") for a in recs]
+                yield json.dumps({"user_id": user_id, "articles": articles}) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/search", response_model=List[SearchResultOut])
+async def search_articles(q: str, limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0),
+                          session: AsyncSession = Depends(get_read_db)):
+    """Full-text search over title, description, content and summary, best BM25 match first;
+    matched words in ``snippet`` are wrapped in <mark></mark>"""
+    return await search(session, q, limit=limit, offset=offset)
+
 @app.get("/test-newsapi")
 async def test_newsapi():
     """Test if NewsAPI is working"""
-    from .fetch_news import newsapi_fetch
-    articles = newsapi_fetch(category="sports", page_size=5)
+    articles = await newsapi_fetch_async(category="sports", page_size=5)
     return {"articles_found": len(articles), "sample_titles": [a["title"] for a in articles[:3]]}
 
+@app.get("/cache-stats", response_model=dict)
+async def get_cache_stats():
+    """Hit/miss counters for the summary/embedding caches and the recommendation cache"""
+    return {**cache_stats(), "recommendations": result_cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/daily-update", response_model=dict)
-async def daily_update(session: AsyncSession = Depends(get_db)):
-    """Fetch fresh content for daily highlights - focuses on recent articles from last 36 hours"""
-    from .fetch_news import newsapi_fetch, gdelt_fetch
-    from datetime import datetime, timedelta
-    
+async def daily_update():
+    """Queue a fetch of fresh content for daily highlights; poll GET /jobs/{job_id} for the result"""
+    job = job_queue.submit("daily-update", _daily_update_job)
+    return {"job_id": job.id, "status": job.status}
+
+async def _daily_update_job(job: Job):
     # Get diverse recent content
     categories = ["technology", "sports", "business", "entertainment", "health"]
-    all_items = []
-    
-    for category in categories:
-        try:
-            # Fetch recent articles with higher page size for better selection
-            items = newsapi_fetch(category=category, page_size=20) or gdelt_fetch(query=category, maxrecords=15)
-            all_items.extend(items)
-        except Exception as e:
-            print(f"Error fetching {category}: {e}")
-            continue
-    
-    # Remove duplicates and add to database - only articles from last 36 hours
-    seen_urls = set()
-    count = 0
-    cutoff_time = datetime.now() - timedelta(hours=36)
+    # Fetch recent articles with higher page size for better selection, all categories at once;
+    # each category streams into the ingest as soon as it arrives
+    job.update("fetch")
+    items = fetch_categories_async(categories, lambda category: (20, 15))
     
-    for it in all_items:
-        if not it["url"] or not it["title"] or it["url"] in seen_urls:
-            continue
-        seen_urls.add(it["url"])
-        
-        # Check if already exists
-        exists = await session.execute(select(Article).where(Article.url == it["url"]))
-        if exists.scalar_one_or_none(): 
-            continue
-        
-        # Only add articles from the last 7 days (with timezone fix)
-        if it["published_at"]:
-            try:
-                from datetime import datetime
-                pub_time = datetime.fromisoformat(it["published_at"].replace('Z', '+00:00'))
-                # Use 7 days for ingestion, 36 hours for display
-                week_cutoff = datetime.now() - timedelta(days=7)
-                # Make week_cutoff timezone-aware for comparison
-                week_cutoff_aware = week_cutoff.replace(tzinfo=pub_time.tzinfo)
-                if pub_time < week_cutoff_aware:
-                    continue  # Skip articles older than 7 days
-            except:
-                # If we can't parse the date, skip it to be safe
-                continue
-            
-        text = " ".join(filter(None, [it["title"], it["description"], it["content"]]))
-        summary = llm_summary(text) if text else ""
-        emb = embed_text(text) if text else []
-        a = Article(
-            url=it["url"], title=it["title"], source=it["source"], author=it["author"],
-            published_at=it["published_at"], description=it["description"], content=it["content"],
-            summary=summary, embedding=dumps_embedding(emb) if emb else None
-        )
-        session.add(a)
-        count += 1
-    
-    await session.commit()
-    return {"ingested": count, "message": "Daily update completed"}
+    # Remove duplicates and add to database - only articles from the last 7 days (36 hours is for display)
+    async with SessionLocal() as session:
+        stats = await ingest_items(session, items, max_age=timedelta(days=7), progress=job.update)
+    return {"ingested": stats["inserted"], "message": "Daily update completed", "stages": stats}
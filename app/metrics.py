@@ -0,0 +1,158 @@
+import bisect, threading, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from a cached DB lookup up to a slow upstream fetch
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Per-request breakdown (name -> [seconds, count]), only set while a request asked for it
+_breakdown: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("metrics_breakdown", default=None)
+
+_registry: List["_Metric"] = []
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _labels(self, values: Tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return super().render() + [f"{self.name}{self._labels(k)} {v:g}" for k, v in values]
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; ``time()`` also feeds the per-request breakdown."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, List] = {}  # label values -> [bucket counts..., sum, count]
+        self._short = name[:-len("_seconds")] if name.endswith("_seconds") else name
+
+    def observe(self, value: float, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+        breakdown = _breakdown.get()
+        if breakdown is not None:
+            key = ".".join((self._short,) + tuple(str(v) for v in label_values))
+            entry = breakdown.setdefault(key, [0.0, 0])
+            entry[0] += value
+            entry[1] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *label_values)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(k, list(v)) for k, v in self._series.items()]
+        lines = super().render()
+        for values, s in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), s):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{self._labels(values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(values)} {s[-2]:.6f}")
+            lines.append(f"{self.name}_count{self._labels(values)} {s[-1]}")
+        return lines
+
+def render() -> str:
+    """Every metric in Prometheus text exposition format."""
+    return "\n".join(line for m in _registry for line in m.render()) + "\n"
+
+def server_timing(breakdown: Dict[str, List[float]]) -> str:
+    """A Server-Timing header value: total milliseconds and call count per timed stage."""
+    return ", ".join(f'{name};dur={secs * 1000:.2f};desc="{count}x"'
+                     for name, (secs, count) in sorted(breakdown.items(), key=lambda kv: -kv[1][0]))
+
+class TimingMiddleware:
+    """ASGI middleware feeding http_request_seconds. Requests sending ``X-Timing: 1`` get a
+    Server-Timing header with everything timed while serving them. Plain ASGI rather than
+    BaseHTTPMiddleware, which would add a task and memory streams to every request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict = {}
+
+    def _route(self, scope) -> str:
+        if not self._routes:
+            self._routes = {r.endpoint: r.path for r in scope["app"].routes if hasattr(r, "endpoint")}
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        breakdown = {} if any(k == b"x-timing" for k, _ in scope["headers"]) else None
+        token = _breakdown.set(breakdown)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if breakdown is not None:
+                    timing = server_timing({"total": [time.perf_counter() - t0, 1], **breakdown})
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _breakdown.reset(token)
+            http_request_seconds.observe(time.perf_counter() - t0, scope["method"], self._route(scope), str(status))
+
+# --- the app's metrics ----------------------------------------------------------
+
+http_request_seconds = Histogram("http_request_seconds", "API request latency", ["method", "route", "status"])
+fetch_seconds = Histogram("fetch_seconds", "Upstream news API request latency", ["api", "query"])
+fetch_errors = Counter("fetch_errors_total", "Failed upstream news API requests", ["api"])
+summarize_seconds = Histogram("summarize_seconds", "Time to a summary for one article", ["source"])
+embed_batch_seconds = Histogram("embed_batch_seconds", "Embedding time per batch", ["embedder"])
+embedded_texts = Counter("embedded_texts_total", "Texts embedded (cache misses)", ["embedder"])
+db_query_seconds = Histogram("db_query_seconds", "SQL statement execution time", ["statement"])
+db_commit_seconds = Histogram("db_commit_seconds", "Commit time of ingest write batches")
+recommend_phase_seconds = Histogram("recommend_phase_seconds", "recommend_for time per phase", ["rank_by", "phase"])
+ingested_items = Counter("ingest_items_total", "Ingest pipeline items by outcome (fetched, duplicate, inserted, ...)", ["outcome"])
@@ -0,0 +1,81 @@
+"""One-off data migrations, applied in order by init_db and tracked with PRAGMA user_version."""
+import json
+from .embeddings import dumps_embedding
+from .dates import parse_published_at
+from .search import BM25_WEIGHTS
+
+def embeddings_to_binary(conn):
+    # JSON text embeddings -> versioned binary blobs (see embeddings.dumps_embedding)
+    rows = conn.exec_driver_sql(
+        "SELECT id, embedding FROM articles WHERE typeof(embedding) = 'text'"
+    ).fetchall()
+    params = []
+    for id_, raw in rows:
+        try:
+            vec = json.loads(raw)
+        except ValueError:
+            vec = None
+        params.append((dumps_embedding(vec) if vec else None, id_))
+    if params:
+        conn.exec_driver_sql("UPDATE articles SET embedding = ? WHERE id = ?", params)
+
+def published_at_to_datetime(conn):
+    # Free-form NewsAPI/GDELT strings -> UTC in SQLAlchemy's SQLite DATETIME format, so the
+    # indexed column compares correctly; unparseable values become NULL
+    rows = conn.exec_driver_sql("SELECT id, published_at FROM articles WHERE published_at IS NOT NULL").fetchall()
+    params = []
+    for id_, raw in rows:
+        dt = parse_published_at(raw)
+        params.append((dt.strftime("%Y-%m-%d %H:%M:%S.%f") if dt else None, id_))
+    if params:
+        conn.exec_driver_sql("UPDATE articles SET published_at = ? WHERE id = ?", params)
+
+def create_search_index(conn):
+    # FTS5 index over the article text (see search.py). External content: the index stores
+    # only tokens and reads the text back from articles; triggers keep it in step with every
+    # write to the indexed columns, whichever code path makes it
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+        "title, description, content, summary, content='articles', content_rowid='id')"
+    )
+    old = "'delete', old.id, old.title, old.description, old.content, old.summary"
+    new = "new.id, new.title, new.description, new.content, new.summary"
+    columns = "articles_fts, rowid, title, description, content, summary"
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts(rowid, title, description, content, summary) VALUES ({new});
+        END""")
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts({columns}) VALUES ({old});
+        END""")
+    conn.exec_driver_sql(f"""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, description, content, summary
+        ON articles BEGIN
+            INSERT INTO articles_fts({columns}) VALUES ({old});
+            INSERT INTO articles_fts(rowid, title, description, content, summary) VALUES ({new});
+        END""")
+    # ORDER BY rank is BM25 with these column weights
+    weights = ", ".join(map(str, BM25_WEIGHTS))
+    conn.exec_driver_sql(f"INSERT INTO articles_fts(articles_fts, rank) VALUES ('rank', 'bm25({weights})')")
+    conn.exec_driver_sql("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+def url_keys(conn):
+    # Dedup keys for stored rows. Where several rows share a key, only the oldest gets it:
+    # url_key is unique
+    from .ingest import normalize_url
+    rows = conn.exec_driver_sql("SELECT id, url FROM articles WHERE url IS NOT NULL ORDER BY id").fetchall()
+    keys = {}
+    for id_, url in rows:
+        keys.setdefault(normalize_url(url), id_)
+    params = [(key, id_) for key, id_ in keys.items()]
+    if params:
+        conn.exec_driver_sql("UPDATE articles SET url_key = ? WHERE id = ?", params)
+
+# Append only; a database at user_version N has run the first N entries.
+MIGRATIONS = [
+    embeddings_to_binary,
+    published_at_to_datetime,
+    create_search_index,
+    url_keys,
+]
@@ -1,20 +1,38 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Index, LargeBinary, UniqueConstraint
+from datetime import timezone
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from .db import Base
 
+class UTCDateTime(TypeDecorator):
+    """Aware datetimes stored as naive UTC (SQLite drops offsets), returned as aware UTC."""
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return value.replace(tzinfo=timezone.utc) if value is not None else None
+
 class Article(Base):
     __tablename__ = "articles"
     id = Column(Integer, primary_key=True)
-    url = Column(String, unique=True, index=True)
+    url = Column(String, unique=True, index=True)  # as the publisher links it
+    url_key = Column(String, unique=True, index=True)  # normalized url the ingest dedups on, see ingest.py
     title = Column(String)
     source = Column(String)
     author = Column(String)
-    published_at = Column(String)
+    published_at = Column(UTCDateTime, index=True)  # normalized at ingest, see dates.py
     description = Column(Text)
     content = Column(Text)
     summary = Column(Text)
-    embedding = Column(Text)  # store as json string (list[float])
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    embedding = Column(LargeBinary)  # versioned float32/float16 blob, see embeddings.py
+    keyword_features = Column(LargeBinary)  # bit-packed keyword hits, see features.py
+    canonical_url = Column(String, index=True)  # set on near-duplicates of that article, see near_dup.py
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # "latest" feed order
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
@@ -22,3 +40,29 @@ class UserProfile(Base):
     user_id = Column(String, index=True)  # simple string identifier
     interests = Column(Text)  # comma-separated interests
     __table_args__ = (UniqueConstraint('user_id', name='uix_user'),)
+
+class SourceWatermark(Base):
+    __tablename__ = "source_watermarks"
+    source = Column(String, primary_key=True)  # e.g. "category:sports"
+    last_published_at = Column(UTCDateTime)  # newest publish time ingested from this source
+    last_run_at = Column(UTCDateTime)
+    lease_until = Column(UTCDateTime)  # a run holds the source until then (overlap protection)
+
+class FeedItem(Base):
+    """One article of a user's materialized feed (SERVING_MODE=materialized, see feeds.py)."""
+    __tablename__ = "feed_items"
+    user_id = Column(String, primary_key=True)
+    article_id = Column(Integer, primary_key=True)
+    score = Column(Float)
+    created = Column(String)  # articles.created_at as stored, the tie-break after score
+    published_at = Column(UTCDateTime, index=True)
+    __table_args__ = (Index("ix_feed_items_rank", "user_id", "score", "created", "article_id"),)
+
+class UserFeed(Base):
+    __tablename__ = "user_feeds"
+    user_id = Column(String, primary_key=True)
+    # No article missing from the feed ranks above this (score, created, article_id); NULL if none is
+    horizon_score = Column(Float)
+    horizon_created = Column(String)
+    horizon_id = Column(Integer)
+    built_at = Column(UTCDateTime)
@@ -0,0 +1,101 @@
+import hashlib, os, re, time
+import numpy as np
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Article
+from .dates import utcnow
+
+# Syndicated copies of one story (AP/Reuters under CNN, ABC, Yahoo, ...) are caught by
+# SimHash over title+description shingles. Single-word shingles work best at headline
+# length: an identical or lightly trimmed copy lands within ~2 bits, a different story on
+# the same topic ~15+, but a headline with one word changed ("Stocks rise..." vs "Stocks
+# fall...") can be as close as 4-5, so the default cut-off stays below that.
+# NEAR_DUP_DETECTION=0 turns it off.
+NEAR_DUP_DETECTION = os.getenv("NEAR_DUP_DETECTION", "1") != "0"
+NEAR_DUP_DISTANCE = int(os.getenv("NEAR_DUP_DISTANCE", "3"))  # max differing bits out of 64
+NEAR_DUP_WINDOW = timedelta(days=float(os.getenv("NEAR_DUP_WINDOW_DAYS", "3")))
+NEAR_DUP_REFRESH = 3600  # seconds before the index is rebuilt (drops stories that left the window)
+# 8 bands of 8 bits: two hashes within 7 bits agree exactly on at least one band
+_BANDS, _BAND_BITS = 8, 8
+_WORD = re.compile(r"\w+")
+
+def shingles(text: str, n: int = 1) -> List[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) <= n:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + n]) for i in range(len(words) - n + 1)]
+
+def simhash(title: Optional[str], description: Optional[str]) -> int:
+    """64-bit SimHash of the word shingles of title+description."""
+    sh = shingles(f"{title or ''} {description or ''}")
+    if not sh:
+        return 0
+    hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in sh],
+                      dtype=np.uint64)
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(sh)
+    return int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+
+def _bands(h: int):
+    mask = (1 << _BAND_BITS) - 1
+    return [(i, (h >> (i * _BAND_BITS)) & mask) for i in range(_BANDS)]
+
+class NearDupIndex:
+    """SimHash LSH over recent canonical articles, mapping a story to its canonical URL."""
+
+    def __init__(self, distance: int = NEAR_DUP_DISTANCE, window: timedelta = NEAR_DUP_WINDOW):
+        self.distance = distance
+        self.window = window
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, str]]] = {}
+        self.size = 0
+        self.loaded_at: Optional[float] = None
+
+    def clear(self):
+        self._buckets = {}
+        self.size = 0
+
+    def add(self, h: int, url: str):
+        if not h:
+            return
+        for band in _bands(h):
+            self._buckets.setdefault(band, []).append((h, url))
+        self.size += 1
+
+    def remove(self, h: int, url: str):
+        """Undo ``add``, e.g. for a story whose row was never stored."""
+        found = False
+        for band in _bands(h) if h else ():
+            entries = self._buckets.get(band)
+            if entries and (h, url) in entries:
+                entries.remove((h, url))
+                found = True
+        self.size -= found
+
+    def match(self, h: int) -> Optional[str]:
+        """URL of the closest indexed story within ``distance`` bits, if any."""
+        if not h:
+            return None
+        best, best_dist = None, self.distance + 1
+        for band in _bands(h):
+            for other, url in self._buckets.get(band, ()):
+                dist = (h ^ other).bit_count()
+                if dist < best_dist:
+                    best, best_dist = url, dist
+        return best
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < NEAR_DUP_REFRESH:
+            return
+        res = await session.execute(
+            select(Article.url, Article.title, Article.description)
+            .where(Article.published_at >= utcnow() - self.window, Article.canonical_url.is_(None))
+            .order_by(Article.id)
+        )
+        self.clear()
+        for r in res.all():
+            self.add(simhash(r.title, r.description), r.url)
+        self.loaded_at = time.monotonic()
+
+near_dups = NearDupIndex()
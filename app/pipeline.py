@@ -0,0 +1,116 @@
+import asyncio, os
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Union
+
+# Items waiting between two stages; a full queue blocks the stage feeding it,
+# so a slow consumer throttles everything upstream instead of buffering it
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+
+_DONE = object()
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+async def aiter_items(items: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    """Async iterator over a plain or async iterable."""
+    if not hasattr(items, "__aiter__"):
+        for item in items:
+            yield item
+        return
+    try:
+        async for item in items:
+            yield item
+    finally:
+        if hasattr(items, "aclose"):
+            await items.aclose()
+
+async def _gather_or_cancel(*aws: Awaitable):
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+
+async def _drain(source: Union[Iterable, AsyncIterable], queue: asyncio.Queue):
+    try:
+        async for item in aiter_items(source):
+            await queue.put(item)
+    except Exception as e:
+        await queue.put(_Failed(e))
+    else:
+        await queue.put(_DONE)
+
+async def stage(fn: Callable[[Any], Awaitable[Optional[Any]]], source: Union[Iterable, AsyncIterable],
+                workers: int = 1, maxsize: int = PIPELINE_QUEUE_SIZE) -> AsyncIterator:
+    """Yield ``await fn(item)`` for every item of ``source``, ``workers`` calls at a time.
+
+    None results are dropped and output order follows completion, not input.
+    An exception in ``fn`` or upstream is re-raised to the consumer.
+    """
+    inbox, outbox = asyncio.Queue(maxsize), asyncio.Queue(maxsize)
+
+    async def work():
+        while True:
+            item = await inbox.get()
+            if item is _DONE or isinstance(item, _Failed):
+                await inbox.put(item)  # let the sibling workers see it too
+                if item is _DONE:
+                    return
+                raise item.error
+            out = await fn(item)
+            if out is not None:
+                await outbox.put(out)
+
+    async def run():
+        try:
+            await _gather_or_cancel(_drain(source, inbox), *(work() for _ in range(max(1, workers))))
+        except Exception as e:
+            await outbox.put(_Failed(e))
+        else:
+            await outbox.put(_DONE)
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            out = await outbox.get()
+            if out is _DONE:
+                break
+            if isinstance(out, _Failed):
+                raise out.error
+            yield out
+    finally:
+        task.cancel()
+
+async def batched(source: Union[Iterable, AsyncIterable], size: int,
+                  maxsize: int = PIPELINE_QUEUE_SIZE) -> AsyncIterator[List]:
+    """Group ``source`` into lists of at most ``size``.
+
+    A batch is handed on as soon as the consumer asks and anything is ready, rather
+    than waiting to fill up, so a trickle of items still flows through promptly.
+    """
+    queue = asyncio.Queue(maxsize)
+    task = asyncio.create_task(_drain(source, queue))
+    try:
+        done = False
+        while not done:
+            batch, item = [], await queue.get()
+            while True:
+                if item is _DONE:
+                    done = True
+                    break
+                if isinstance(item, _Failed):
+                    raise item.error
+                batch.append(item)
+                if len(batch) >= size or queue.empty():
+                    break
+                item = queue.get_nowait()
+            if batch:
+                yield batch
+    finally:
+        task.cancel()
+
+async def unbatched(source: AsyncIterable[Iterable]) -> AsyncIterator:
+    async for batch in aiter_items(source):
+        for item in batch:
+            yield item
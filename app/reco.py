@@ -1,175 +1,312 @@
+import asyncio, base64, heapq, json, os
 import numpy as np
-from sqlalchemy import select
+from datetime import timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import String, and_, or_, select, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 from .models import Article, UserProfile
-from .embeddings import loads_embedding, embed_text
+from .embeddings import embed_texts_cached
+from .features import is_current, profile_vector, score_articles
+from .ann_index import active_index
+from .feature_store import FEATURE_STORE, feature_store, load_columns
+from .search import articles_fts, matching, profile_query
+from .dates import utcnow
+from .metrics import recommend_phase_seconds
+
+RECENT_WINDOW = timedelta(hours=36)
+FALLBACK_WINDOW = timedelta(days=7)
+# Near-duplicates (syndicated copies, see near_dup.py) are never recommended
+CANONICAL = Article.canonical_url.is_(None)
+# Candidates are scored this many rows at a time, from these columns only
+RECO_CHUNK_SIZE = int(os.getenv("RECO_CHUNK_SIZE", "5000"))
+# created_at as stored: server-default and bulk-loaded rows use different text formats, and
+# the cursor must compare against exactly what SQLite compares
+CREATED = type_coerce(Article.created_at, String).label("created")
+SCORE_COLUMNS = (Article.id, CREATED, Article.keyword_features)
+TEXT_COLUMNS = (Article.title, Article.description, Article.content)
+# "fts": keyword candidates come from the full-text index (search.py) and only articles
+# containing one of the profile's keywords as a word are scored; "scan" scores every row
+KEYWORD_CANDIDATES = os.getenv("KEYWORD_CANDIDATES", "scan")
 
 def cosine(a: np.ndarray, b: np.ndarray) -> float:
     denom = (np.linalg.norm(a)*np.linalg.norm(b) + 1e-9)
     return float(np.dot(a,b) / denom)
 
-async def recommend_for(session: AsyncSession, user_id: str, k: int = 10):
+def profile_embedding(interests: List[str]) -> np.ndarray:
+    # Mean of the interest embeddings; the store normalizes queries itself. Blocking (it may
+    # load and run the embedding model), so async callers go through asyncio.to_thread
+    return np.mean(embed_texts_cached(interests), axis=0)
+
+def profile_embeddings(profiles: List[List[str]]) -> List[np.ndarray]:
+    """profile_embedding for many profiles, their distinct interests embedded in one batch."""
+    unique = list(dict.fromkeys(i for interests in profiles for i in interests))
+    vecs = dict(zip(unique, embed_texts_cached(unique)))
+    return [np.mean([vecs[i] for i in interests], axis=0) for interests in profiles]
+
+def encode_cursor(position: Dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict:
+    """The position a page ended at: ``{"s": score, "c": created, "i": id, "n": served}`` inside
+    the ranked feed, or ``{"f": id}`` inside the fallback. Raises ValueError if malformed."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("invalid cursor")
+    ranked = {"s": (int, float), "c": str, "i": int, "n": int}
+    if not isinstance(position, dict) or not (
+            all(isinstance(position.get(key), kind) for key, kind in ranked.items())
+            or isinstance(position.get("f"), int)):
+        raise ValueError("invalid cursor")
+    return position
+
+async def _chunks(session: AsyncSession, columns, *where, size: int = RECO_CHUNK_SIZE):
+    """Keyset-paginated rows in id order, ``size`` at a time."""
+    last = 0
+    while True:
+        res = await session.execute(select(*columns).where(Article.id > last, *where).order_by(Article.id).limit(size))
+        rows = res.all()
+        if rows:
+            yield rows
+        if len(rows) < size:
+            return
+        last = rows[-1].id
+
+async def keyword_top(session: AsyncSession, interests: List[str], where, k: int, before: Optional[Tuple]) -> List[Tuple]:
+    """Best ``k`` (score, created, id) keys ranked below ``before``, scored a chunk at a time."""
+    _, extra = profile_vector(interests)
+    # Text is only needed for interests outside VOCAB; otherwise just for rows with stale features
+    columns = SCORE_COLUMNS + (TEXT_COLUMNS if extra is not None else ())
+    top: List[Tuple] = []
+    async for rows in _chunks(session, columns, *where):
+        top = heapq.nlargest(k, top + await _keys(session, rows, interests, extra, before))
+    return top
+
+async def _keys(session: AsyncSession, rows, interests: List[str], extra, before: Optional[Tuple]) -> List[Tuple]:
+    # Ranking keys below ``before`` for projected rows, reading text only for stale features
+    stale = [] if extra is not None else [r.id for r in rows if not is_current(r.keyword_features)]
+    if stale:
+        res = await session.execute(select(*SCORE_COLUMNS, *TEXT_COLUMNS).where(Article.id.in_(stale)))
+        full = {r.id: r for r in res.all()}
+        rows = [full.get(r.id, r) for r in rows]
+    keys = [(score, r.created or "", r.id) for score, r in zip(score_articles(rows, interests), rows)]
+    return keys if before is None else [key for key in keys if key < before]
+
+async def fts_keyword_top(session: AsyncSession, interests: List[str], where, k: int,
+                          before: Optional[Tuple]) -> List[Tuple]:
+    """keyword_top with candidates from the full-text index: only articles matching the
+    profile's keywords are read and scored; every other row scores 0 and ranks by recency."""
+    _, extra = profile_vector(interests)
+    columns = SCORE_COLUMNS + (TEXT_COLUMNS if extra is not None else ())
+    expression = profile_query(interests)
+    top: List[Tuple] = []
+    if expression is not None:
+        matched = select(articles_fts.c.rowid).where(matching(expression))
+        # One statement, so the MATCH runs once; the rows are only the matching ones
+        res = await session.execute(select(*columns).where(Article.id.in_(matched), *where))
+        for rows in res.partitions(RECO_CHUNK_SIZE):
+            top = heapq.nlargest(k, top + await _keys(session, rows, interests, extra, before))
+        where = (*where, Article.id.not_in(matched))
+    if top and len(top) == k and top[-1][0] > 0:
+        return top
+    # The newest of the unmatched rows can still outrank zero-score candidates
+    query = select(Article.id, CREATED).where(*where).order_by(CREATED.desc(), Article.id.desc()).limit(k)
+    if before is not None and before[0] <= 0:
+        _, created, last = before
+        query = query.where(or_(CREATED < created, and_(CREATED == created, Article.id < last)))
+    res = await session.execute(query)
+    return heapq.nlargest(k, top + [(0.0, r.created or "", r.id) for r in res.all()])
+
+async def _hydrate(session: AsyncSession, ids: List[int]) -> List[Article]:
+    """Full rows for ``ids``, in that order."""
+    if not ids:
+        return []
+    res = await session.execute(select(Article).where(Article.id.in_(ids)))
+    by_id = {a.id: a for a in res.scalars().all()}
+    return [by_id[i] for i in ids if i in by_id]
+
+async def _latest(session: AsyncSession, k: int, before: Optional[Tuple]) -> Tuple[List[Article], Optional[str]]:
+    # No profile: the newest articles, paged on (created, id)
+    query = select(Article).where(CANONICAL).order_by(Article.created_at.desc(), Article.id.desc()).limit(k)
+    if before is not None:
+        _, created, last = before
+        query = query.where(or_(CREATED < created, and_(CREATED == created, Article.id < last)))
+    res = await session.execute(query.add_columns(CREATED))
+    rows = res.all()
+    cursor = None
+    if rows and len(rows) == k:
+        cursor = encode_cursor({"s": 0, "c": rows[-1].created, "i": rows[-1].Article.id, "n": 0})
+    return [r.Article for r in rows], cursor
+
+async def recommend_page(session: AsyncSession, user_id: str, k: int = 10, rank_by: str = "keywords",
+                         cursor: Optional[str] = None) -> Tuple[List[Article], Optional[str]]:
+    """One page of the ranked feed and the cursor of the next one (None on the last page).
+
+    Candidates are scored from a few projected columns, ``RECO_CHUNK_SIZE`` rows at a time,
+    keeping only the best ``k`` below the cursor, so memory does not grow with the table;
+    full rows are loaded for the returned page only.
+    """
+    phase = lambda name: recommend_phase_seconds.time(rank_by, name)
+    position = decode_cursor(cursor) if cursor else {"s": None, "n": 0}
+    before = (position["s"], position["c"], position["i"]) if position.get("s") is not None else None
     # Get user profile
-    res = await session.execute(select(UserProfile).where(UserProfile.user_id == user_id))
-    prof = res.scalar_one_or_none()
+    with phase("profile"):
+        res = await session.execute(select(UserProfile).where(UserProfile.user_id == user_id))
+        prof = res.scalar_one_or_none()
     
-    if not prof or not prof.interests:
+    interests = [s.strip().lower() for s in prof.interests.split(",") if s.strip()] if prof and prof.interests else []
+    if not interests:
         # No profile - return recent articles
-        res = await session.execute(select(Article).order_by(Article.created_at.desc()))
-        arts = res.scalars().all()
-        return arts[:k]
+        return await _latest(session, k, before)
     
-    interests = [s.strip().lower() for s in prof.interests.split(",") if s.strip()]
-    if not interests:
-        res = await session.execute(select(Article).order_by(Article.created_at.desc()))
-        arts = res.scalars().all()
-        return arts[:k]
+    # For daily highlights only articles from the last 36 hours are ranked; the windows are
+    # applied in SQL on the indexed published_at column
+    now = utcnow()
+    recent_cutoff = now - RECENT_WINDOW
+    top: List[Tuple] = []
+    # The shared memory-mapped columns (feature_store.py), unless it's off, missing or too old
+    view = feature_store.view() if FEATURE_STORE else None
+    if view is not None and not view.covers(recent_cutoff):
+        view = None
+    scores = None
+    if view is not None and "f" not in position:
+        with phase("score"):
+            if rank_by == "embedding":
+                scores = view.similarities(await asyncio.to_thread(profile_embedding, interests))
+            else:
+                scores = view.keyword_scores(interests)
+            if scores is not None:
+                top = view.top(scores, recent_cutoff, k, before, embedded_only=rank_by == "embedding")
     
-    # Get all articles
-    res = await session.execute(select(Article))
-    arts = res.scalars().all()
+    if "f" in position or scores is not None:
+        pass  # the ranked part of the feed is used up, or was ranked from the store
+    elif rank_by == "embedding":
+        # Nearest neighbours of the profile embedding (exact matrix or IVF, see ann_index.py),
+        # searched among the window's articles only; later pages search deeper
+        index = active_index()
+        with phase("search"):
+            await index.ensure_loaded(session)
+            res = await session.execute(select(Article.id, CREATED).where(Article.published_at >= recent_cutoff, CANONICAL))
+            created = {r.id: r.created or "" for r in res.all()}
+            q = await asyncio.to_thread(profile_embedding, interests)
+            ids, sims = index.search(q, k=max((position["n"] + k) * 10, 100),
+                                     among=np.fromiter(created, dtype=np.int64, count=len(created)))
+        with phase("score"):
+            keys = [(float(sim), created[i], i) for i, sim in zip(ids, sims)]
+            top = heapq.nlargest(k, (key for key in keys if before is None or key < before))
+    else:
+        # Keyword scoring from the hit vectors stored at ingest (features.py)
+        with phase("score"):
+            rank = fts_keyword_top if KEYWORD_CANDIDATES == "fts" else keyword_top
+            top = await rank(session, interests, (Article.published_at >= recent_cutoff, CANONICAL), k, before)
     
-    # Aggressive keyword-based scoring with comprehensive matching
-    scored = []
-    for article in arts:
-        score = 0.0
-        text_to_search = f"{article.title} {article.description} {article.content}".lower()
-        
-        # Direct keyword matching with higher weights
-        for interest in interests:
-            if interest in text_to_search:
-                score += 3.0  # Much higher weight for direct matches
-        
-        # Comprehensive technology matching
-        if any(tech in interests for tech in ["technology", "ai", "tech", "apple", "google", "microsoft", "computer", "software"]):
-            tech_keywords = [
-                "ai", "artificial intelligence", "machine learning", "neural network", "algorithm",
-                "apple", "google", "microsoft", "amazon", "meta", "facebook", "tesla", "openai",
-                "tech", "technology", "software", "computer", "digital", "innovation", "startup",
-                "chip", "semiconductor", "cpu", "gpu", "processor", "intel", "nvidia", "amd",
-                "smartphone", "iphone", "android", "app", "application", "programming", "code",
-                "cybersecurity", "hacking", "data", "cloud", "server", "database", "internet",
-                "automation", "robot", "drone", "electric", "battery", "solar", "renewable",
-                "crypto", "bitcoin", "blockchain", "nft", "web3", "metaverse", "vr", "ar"
-            ]
-            for keyword in tech_keywords:
-                if keyword in text_to_search:
-                    score += 2.0  # High weight for tech keywords
-        
-        # Comprehensive sports matching
-        if any(sport in interests for sport in ["sports", "football", "basketball", "soccer", "baseball", "tennis", "golf"]):
-            sports_keywords = [
-                "nfl", "nba", "nhl", "mlb", "nascar", "pga", "tennis", "golf", "soccer", "football", 
-                "basketball", "baseball", "hockey", "racing", "olympics", "championship", "playoff",
-                "panthers", "lakers", "warriors", "cowboys", "patriots", "yankees", "dodgers",
-                "game", "team", "player", "coach", "season", "score", "win", "loss", "victory",
-                "stadium", "arena", "field", "court", "track", "gym", "training", "fitness"
-            ]
-            for keyword in sports_keywords:
-                if keyword in text_to_search:
-                    score += 2.0  # High weight for sports keywords
-        
-        # Comprehensive business matching
-        if any(biz in interests for biz in ["business", "finance", "economy", "market", "stock", "money", "investment"]):
-            biz_keywords = [
-                "business", "finance", "economy", "market", "stock", "investment", "trading",
-                "company", "corporate", "financial", "bank", "banking", "loan", "credit",
-                "revenue", "profit", "loss", "earnings", "quarterly", "ipo", "merger", "acquisition",
-                "ceo", "executive", "board", "shareholder", "dividend", "portfolio", "fund",
-                "startup", "venture", "capital", "funding", "valuation", "unicorn", "ipo"
-            ]
-            for keyword in biz_keywords:
-                if keyword in text_to_search:
-                    score += 2.0  # High weight for business keywords
-        
-        # Health and science matching
-        if any(health in interests for health in ["health", "science", "medical", "medicine", "research"]):
-            health_keywords = [
-                "health", "medical", "medicine", "doctor", "hospital", "patient", "treatment",
-                "research", "study", "clinical", "trial", "vaccine", "drug", "therapy",
-                "cancer", "diabetes", "heart", "brain", "mental", "psychology", "therapy",
-                "fitness", "exercise", "nutrition", "diet", "wellness", "lifestyle"
-            ]
-            for keyword in health_keywords:
-                if keyword in text_to_search:
-                    score += 2.0
-        
-        # Entertainment matching
-        if any(ent in interests for ent in ["entertainment", "movie", "music", "celebrity", "hollywood"]):
-            ent_keywords = [
-                "movie", "film", "cinema", "hollywood", "actor", "actress", "director", "producer",
-                "music", "song", "album", "artist", "singer", "band", "concert", "tour",
-                "celebrity", "famous", "star", "award", "oscar", "grammy", "emmy", "golden globe",
-                "netflix", "disney", "hbo", "streaming", "tv", "television", "series", "show"
-            ]
-            for keyword in ent_keywords:
-                if keyword in text_to_search:
-                    score += 2.0
-        
-        scored.append((score, article))
+    # Sorted by score (highest first), then by recency (most recent first)
+    with phase("load"):
+        result = await _hydrate(session, [i for _, _, i in top])
+    next_cursor = None
+    if top and len(top) == k:
+        score, created, last = top[-1]
+        next_cursor = encode_cursor({"s": score, "c": created, "i": last, "n": position["n"] + k})
     
-    # Sort by score (highest first), then by recency (most recent first)
-    scored.sort(key=lambda x: (x[0], x[1].created_at), reverse=True)
+    # Final fallback: if not enough articles, take any older ones from the last 7 days
+    if len(result) < k:
+        with phase("fallback"):
+            res = await session.execute(
+                select(Article)
+                .where(Article.published_at >= now - FALLBACK_WINDOW, Article.published_at < recent_cutoff,
+                       Article.id > position.get("f", 0), CANONICAL)
+                .order_by(Article.id)
+                .limit(k - len(result))
+            )
+            fallback = res.scalars().all()
+            result.extend(fallback)
+        if len(result) == k and fallback:
+            next_cursor = encode_cursor({"f": fallback[-1].id})
     
-    # For daily highlights, prioritize recent articles even if they have lower scores
-    # Get articles from the last 36 hours
-    from datetime import datetime, timedelta
-    recent_cutoff = datetime.now() - timedelta(hours=36)
+    return result[:k], next_cursor
+
+async def recommend_for(session: AsyncSession, user_id: str, k: int = 10, rank_by: str = "keywords"):
+    return (await recommend_page(session, user_id, k, rank_by))[0]
+
+# Users ranked together in one pass of recommend_batch
+BATCH_USERS = int(os.getenv("BATCH_USERS", "256"))
+
+async def recommend_batch(session: AsyncSession, user_ids: Sequence[str], k: int = 10,
+                          rank_by: str = "keywords") -> AsyncIterator[Tuple[str, List[Article]]]:
+    """First pages of the feed for many users, yielded per user as each block of BATCH_USERS is done.
+
+    Candidate columns are read once (from the feature store when it's fresh), and each block
+    of users is ranked with one users x candidates matrix multiply per chunk; the pages are
+    the ones recommend_page returns. Profiles whose interests need article text (outside the
+    keyword vocabulary) go through recommend_page one at a time.
+    """
+    phase = lambda name: recommend_phase_seconds.time(rank_by, name)
+    user_ids = list(dict.fromkeys(user_ids))
+    with phase("profile"):
+        profiles = {}
+        for start in range(0, len(user_ids), 500):
+            res = await session.execute(select(UserProfile).where(UserProfile.user_id.in_(user_ids[start:start + 500])))
+            profiles.update((p.user_id, p.interests) for p in res.scalars().all())
     
-    recent_articles = []
-    older_articles = []
+    now = utcnow()
+    recent_cutoff = now - RECENT_WINDOW
+    columns = feature_store.view() if FEATURE_STORE else None
+    if columns is None or not columns.covers(recent_cutoff):
+        with phase("load"):
+            columns = await load_columns(session, recent_cutoff, embeddings=rank_by == "embedding")
+    with phase("fallback"):
+        res = await session.execute(
+            select(Article)
+            .where(Article.published_at >= now - FALLBACK_WINDOW, Article.published_at < recent_cutoff, CANONICAL)
+            .order_by(Article.id)
+            .limit(k)
+        )
+        fallback = res.scalars().all()
+    latest = None
     
-    for score, article in scored:
-        # Must have a published_at date to be considered
-        if not article.published_at:
-            continue
-            
-        # Check published_at timestamp - this is the primary filter
-        try:
-            from datetime import datetime
-            pub_time = datetime.fromisoformat(article.published_at.replace('Z', '+00:00'))
-            # Make recent_cutoff timezone-aware for comparison
-            recent_cutoff_aware = recent_cutoff.replace(tzinfo=pub_time.tzinfo)
-            if pub_time >= recent_cutoff_aware:
-                recent_articles.append((score, article))
+    for start in range(0, len(user_ids), BATCH_USERS):
+        block = user_ids[start:start + BATCH_USERS]
+        pages: Dict[str, List[int]] = {}
+        ranked, weights = [], []
+        interests_of = {user_id: [s.strip().lower() for s in (profiles.get(user_id) or "").split(",") if s.strip()]
+                        for user_id in block}
+        interests_of = {user_id: interests for user_id, interests in interests_of.items() if interests}
+        if rank_by == "embedding" and interests_of:
+            with phase("embed"):
+                embedded = dict(zip(interests_of, await asyncio.to_thread(profile_embeddings, list(interests_of.values()))))
+        for user_id, interests in interests_of.items():
+            if rank_by == "embedding":
+                q = embedded[user_id]
+                if q.shape != (columns.dim,):
+                    pages[user_id] = None
+                    continue
+                weights.append(q / (np.linalg.norm(q) + 1e-9))
             else:
-                # Debug: print articles being filtered out
-                print(f"Filtering out old article: {article.title[:50]}... from {article.published_at}")
-        except Exception as e:
-            # If we can't parse the date, skip the article to be safe
-            print(f"Error parsing date {article.published_at}: {e}")
-            continue
-    
-    # Only return articles from the last 36 hours
-    result = []
-    for score, article in recent_articles[:k]:
-        result.append(article)
-    
-    # If we don't have enough relevant articles, add some recent ones regardless of score
-    if len(result) < k:
-        print(f"Only found {len(result)} relevant articles, adding recent ones...")
-        # Get recent articles that weren't already included
-        already_included = {article.id for article in result}
-        for score, article in recent_articles:
-            if article.id not in already_included and len(result) < k:
-                result.append(article)
-    
-    # Final fallback: if still not enough articles, get any recent articles
-    if len(result) < k:
-        print(f"Still only {len(result)} articles, using fallback...")
-        # Get any articles from the last 7 days
-        from datetime import datetime, timedelta
-        week_cutoff = datetime.now() - timedelta(days=7)
-        fallback_articles = []
-        for article in arts:
-            if article.published_at:
-                try:
-                    pub_time = datetime.fromisoformat(article.published_at.replace('Z', '+00:00'))
-                    week_cutoff_aware = week_cutoff.replace(tzinfo=pub_time.tzinfo)
-                    if pub_time >= week_cutoff_aware and article.id not in {a.id for a in result}:
-                        fallback_articles.append(article)
-                except:
+                vec, extra = profile_vector(interests)
+                if extra is not None:
+                    pages[user_id] = None
                     continue
-        result.extend(fallback_articles[:k-len(result)])
-    
-    return result[:k]
+                weights.append(vec)
+            ranked.append(user_id)
+        if ranked:
+            with phase("score"):
+                tops = await asyncio.to_thread(columns.top_many, np.stack(weights).astype(np.float32),
+                                               rank_by == "embedding", recent_cutoff, k)
+            pages.update(zip(ranked, tops))
+        
+        with phase("load"):
+            needed = list({i for ids in pages.values() if ids for i in ids})
+            by_id = {}
+            for chunk in range(0, len(needed), 500):
+                res = await session.execute(select(Article).where(Article.id.in_(needed[chunk:chunk + 500])))
+                by_id.update((a.id, a) for a in res.scalars().all())
+        for user_id in block:
+            if user_id not in pages:
+                if latest is None:
+                    latest, _ = await _latest(session, k, None)
+                yield user_id, latest
+            elif pages[user_id] is None:
+                yield user_id, await recommend_for(session, user_id, k, rank_by)
+            else:
+                result = [by_id[i] for i in pages[user_id] if i in by_id]
+                yield user_id, (result + fallback[:k - len(result)])[:k]
@@ -0,0 +1,56 @@
+import os, time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Ranked id lists are reused until the user's profile or the corpus changes. The TTL
+# bounds staleness from the sliding 36-hour window and from writes made by other workers.
+RESULT_CACHE_ITEMS = int(os.getenv("RESULT_CACHE_ITEMS", "10000"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "60"))
+
+_corpus_version = 0
+_profile_versions: Dict[str, int] = {}
+
+def bump_corpus_version():
+    global _corpus_version
+    _corpus_version += 1
+
+def bump_profile_version(user_id: str):
+    _profile_versions[user_id] = _profile_versions.get(user_id, 0) + 1
+
+class ResultCache:
+    """LRU of ranked pages (article ids, next cursor) keyed by (user_id, request params,
+    profile version, corpus version)."""
+
+    def __init__(self, max_items: int = RESULT_CACHE_ITEMS, ttl: float = RESULT_CACHE_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self.hits = self.misses = 0
+
+    def key(self, user_id: str, params: Hashable) -> Tuple:
+        """The cache key for a page as of now. Take it before ranking and pass the same key to
+        ``put``: a profile or corpus change made meanwhile then leaves the page unreachable
+        instead of filing it under the new versions."""
+        return (user_id, params, _profile_versions.get(user_id, 0), _corpus_version)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        entry = self._items.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._items[key]
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple, page: Any):
+        self._items[key] = (time.monotonic() + self.ttl, page)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "items": len(self._items)}
+
+result_cache = ResultCache()
@@ -0,0 +1,101 @@
+import asyncio, os, random
+from datetime import timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .db import ReadSessionLocal, SessionLocal
+from .models import SourceWatermark
+from .fetch_news import fetch_category_async
+from .ingest import ingest_items
+from .dates import parse_published_at, utcnow
+
+# Periodic background ingest, one task per source. INGEST_SCHEDULER=0 turns it off.
+INGEST_SCHEDULER = os.getenv("INGEST_SCHEDULER", "1") != "0"
+INGEST_INTERVAL = float(os.getenv("INGEST_INTERVAL", "900"))  # seconds between runs of a source
+INGEST_JITTER = float(os.getenv("INGEST_JITTER", "0.1"))  # +/- fraction of the interval
+SCHEDULED_CATEGORIES = ["technology", "sports", "business", "entertainment", "health"]
+# A crashed run releases its source after this long
+LEASE = timedelta(minutes=10)
+
+async def _acquire(source: str) -> bool:
+    """Take the source's lease, so two workers (or a slow previous run) never ingest it at once."""
+    now = utcnow()
+    async with SessionLocal() as session:
+        await session.execute(
+            sqlite_insert(SourceWatermark).values(source=source).on_conflict_do_nothing(index_elements=["source"])
+        )
+        res = await session.execute(
+            update(SourceWatermark)
+            .where(SourceWatermark.source == source,
+                   or_(SourceWatermark.lease_until.is_(None), SourceWatermark.lease_until < now))
+            .values(lease_until=now + LEASE)
+        )
+        await session.commit()
+        return res.rowcount == 1
+
+async def run_source(category: str, page_size: int = 20, maxrecords: int = 15) -> Optional[Dict[str, int]]:
+    """One incremental ingest of a category: only items newer than its watermark are processed.
+
+    Returns the ingest stage counts, or None if another run holds the source.
+    """
+    source = f"category:{category}"
+    if not await _acquire(source):
+        print(f"Skipping {source}: another run holds it")
+        return None
+    async with ReadSessionLocal() as reader:
+        since = (await reader.get(SourceWatermark, source)).last_published_at
+    done = {"last_run_at": None, "lease_until": None}
+    try:
+        items = await fetch_category_async(category, page_size, maxrecords, since=since)
+        stamps = {id(it): parse_published_at(it["published_at"]) for it in items}
+        if since is not None:
+            # NewsAPI top-headlines can't filter by time, so drop what we've already seen here
+            items = [it for it in items if stamps[id(it)] is None or stamps[id(it)] > since]
+        async with SessionLocal() as session:
+            stats = await ingest_items(session, items, max_age=timedelta(days=7))
+        newest = max((stamps[id(it)] for it in items if stamps[id(it)] is not None), default=None)
+        if newest is not None and (since is None or newest > since):
+            done["last_published_at"] = newest
+        return stats
+    finally:
+        done["last_run_at"] = utcnow()
+        async with SessionLocal() as session:
+            await session.execute(update(SourceWatermark).where(SourceWatermark.source == source).values(**done))
+            await session.commit()
+
+class IngestScheduler:
+    """Runs run_source for every scheduled category on its own jittered timer."""
+
+    def __init__(self, categories: List[str] = SCHEDULED_CATEGORIES, interval: float = INGEST_INTERVAL,
+                 jitter: float = INGEST_JITTER):
+        self.categories = categories
+        self.interval = interval
+        self.jitter = jitter
+        self._tasks: List[asyncio.Task] = []
+
+    def _delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _loop(self, category: str):
+        # Spread the first runs over a fraction of the interval so sources don't fire together
+        await asyncio.sleep(random.uniform(0, self.interval * self.jitter))
+        while True:
+            try:
+                await run_source(category)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Scheduled ingest of {category} failed: {e!r}")
+            await asyncio.sleep(self._delay())
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop(c)) for c in self.categories]
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+scheduler = IngestScheduler()
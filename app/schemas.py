@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class ArticleOut(BaseModel):
@@ -6,10 +7,25 @@ class ArticleOut(BaseModel):
     url: str
     title: str
     source: str
-    published_at: str
+    published_at: Optional[datetime]
     summary: str
     class Config: from_attributes = True
 
 class UserProfileIn(BaseModel):
     user_id: str
     interests: List[str]
+
+class BatchRecommendationsIn(BaseModel):
+    user_ids: List[str] = Field(..., max_length=10000)
+    k: int = Field(10, ge=1, le=100)
+    rank_by: str = "keywords"
+
+class SearchResultOut(BaseModel):
+    id: int
+    url: str
+    title: str
+    source: str
+    published_at: Optional[datetime]
+    score: float
+    snippet: str
+    class Config: from_attributes = True
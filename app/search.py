@@ -0,0 +1,54 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import Float, Integer, column, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Article
+from .keywords import profile_weights
+
+# The FTS5 index over title, description, content and summary (created by the
+# create_search_index migration, kept in sync by triggers on articles). Its ``rank``
+# column is BM25 with the weights below, lower is better.
+articles_fts = table("articles_fts", column("rowid", Integer), column("rank", Float))
+FTS = literal_column("articles_fts")
+# BM25 weight per indexed column: title, description, content, summary
+BM25_WEIGHTS = (4.0, 2.0, 1.0, 1.0)
+SNIPPET_TOKENS = 16
+
+def _quote(term: str) -> str:
+    # An FTS5 string: matches its tokens as a phrase, with no query syntax of its own
+    return '"' + term.replace('"', '""') + '"'
+
+def search_query(q: str) -> Optional[str]:
+    """MATCH expression for free text: every word must appear, the last one as a prefix so
+    results show up while typing. None if there are no words."""
+    words = q.split()
+    if not words:
+        return None
+    return " ".join(_quote(w) for w in words) + "*"
+
+def profile_query(interests: Iterable[str]) -> Optional[str]:
+    """MATCH expression for articles containing any keyword the profile scores (see
+    keywords.profile_weights). Single words match as token prefixes, so "stock" finds
+    "stocks"; unlike the substring scan, a keyword inside a word ("ai" in "said") doesn't."""
+    terms = [_quote(kw) + ("" if any(ch.isspace() for ch in kw) else "*")
+             for kw in sorted(profile_weights(interests)) if kw.strip()]
+    return " OR ".join(terms) or None
+
+def matching(expression: str):
+    return FTS.op("MATCH")(expression)
+
+async def search(session: AsyncSession, q: str, limit: int = 20, offset: int = 0) -> List:
+    """Articles matching ``q``, best BM25 first, with a highlighted snippet of the best column."""
+    expression = search_query(q)
+    if expression is None:
+        return []
+    snippet = func.snippet(FTS, -1, "<mark>", "</mark>", "…", SNIPPET_TOKENS).label("snippet")
+    res = await session.execute(
+        select(Article.id, Article.url, Article.title, Article.source, Article.published_at,
+               (-articles_fts.c.rank).label("score"), snippet)
+        .join_from(articles_fts, Article, Article.id == articles_fts.c.rowid)
+        .where(matching(expression), Article.canonical_url.is_(None))
+        .order_by(articles_fts.c.rank)
+        .limit(limit)
+        .offset(offset)
+    )
+    return res.all()
@@ -1,20 +1,88 @@
-import os, re
-from openai import OpenAI
+import asyncio, os, random, re, time
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional
+from .cache import content_cache
+from .metrics import summarize_seconds
+
+# openai (and the httpx stack under it) is only imported once a client is needed
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+SUMMARY_MODEL = "gpt-4o-mini"
+# Bump when _messages changes so cached summaries from the old prompt are not reused
+PROMPT_VERSION = 1
+summary_cache = content_cache("summary", f"{SUMMARY_MODEL}:p{PROMPT_VERSION}")
+# Batch summarization tuning: concurrent requests, attempts per article, per-article time budget (s)
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+SUMMARY_RETRIES = int(os.getenv("SUMMARY_RETRIES", "3"))
+SUMMARY_TIMEOUT = float(os.getenv("SUMMARY_TIMEOUT", "30"))
 
 def extractive_summary(text: str, max_sent=3) -> str:
     # naive top-sentence selection by position & length
     sents = re.split(r'(?<=[.!?])\s+', text.strip())
     return " ".join(sents[:max_sent])
 
-def llm_summary(text: str) -> str:
-    api = os.getenv("OPENAI_API_KEY")
-    if not api: return extractive_summary(text)
-    client = OpenAI(api_key=api)
+def _messages(text: str) -> List[dict]:
     prompt = f"Summarize in 3 concise bullets:\n\n{text[:8000]}"
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role":"user","content":prompt}],
-        temperature=0.2,
-        max_tokens=200,
-    )
-    return resp.choices[0].message.content.strip()
+    return [{"role":"user","content":prompt}]
+
+@lru_cache(maxsize=1)
+def _async_client(api_key: str, loop: asyncio.AbstractEventLoop) -> "AsyncOpenAI":
+    # One client per event loop (its connection pool is bound to the loop).
+    # Retries are handled in _summarize_one so backoff and the time budget cover every attempt.
+    # OPENAI_BASE_URL (read by the client) can point this at a local stub server.
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key, max_retries=0, timeout=SUMMARY_TIMEOUT)
+
+def _retryable(e: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+    if isinstance(e, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(e, APIStatusError) and e.status_code >= 500
+
+async def _summarize_one(client: "AsyncOpenAI", text: str) -> str:
+    for attempt in range(SUMMARY_RETRIES):
+        try:
+            resp = await client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=_messages(text),
+                temperature=0.2,
+                max_tokens=200,
+            )
+            return resp.choices[0].message.content.strip()
+        except Exception as e:
+            if attempt + 1 >= SUMMARY_RETRIES or not _retryable(e):
+                raise
+            # Exponential backoff with jitter: ~0.5s, 1s, 2s, ...
+            await asyncio.sleep(0.5 * 2 ** attempt * (0.5 + random.random()))
+    raise RuntimeError("unreachable")
+
+async def _llm_or_none(text: str, limit: Optional[asyncio.Semaphore]) -> Optional[str]:
+    # Cached or fresh LLM summary; None on timeout/failure so callers can fall back
+    t0 = time.perf_counter()
+    cached = await summary_cache.aget(text)
+    if cached is not None:
+        summarize_seconds.observe(time.perf_counter() - t0, "cache")
+        return cached.decode()
+    client = _async_client(os.environ["OPENAI_API_KEY"], asyncio.get_running_loop())
+    try:
+        if limit is None:
+            summary = await asyncio.wait_for(_summarize_one(client, text), SUMMARY_TIMEOUT)
+        else:
+            async with limit:
+                summary = await asyncio.wait_for(_summarize_one(client, text), SUMMARY_TIMEOUT)
+    except Exception as e:
+        summarize_seconds.observe(time.perf_counter() - t0, "failed")
+        print(f"LLM summary failed, using extractive fallback: {e!r}")
+        return None
+    summarize_seconds.observe(time.perf_counter() - t0, "llm")
+    # Only real LLM output is cached; fallbacks are retried next time
+    await summary_cache.aput(text, summary.encode())
+    return summary
+
+async def llm_summary_async(text: str, limit: Optional[asyncio.Semaphore] = None) -> str:
+    """LLM summary of ``text``; falls back to extractive_summary on timeout or once retries are exhausted."""
+    if not os.getenv("OPENAI_API_KEY") or not text:
+        with summarize_seconds.time("extractive"):
+            return extractive_summary(text)
+    return await _llm_or_none(text, limit) or extractive_summary(text)
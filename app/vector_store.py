@@ -0,0 +1,125 @@
+import asyncio
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Article
+from .embeddings import loads_embedding
+
+async def load_embedding_matrix(session: AsyncSession) -> Tuple[np.ndarray, np.ndarray]:
+    """Every stored embedding in one query, as (ids, float32 matrix).
+
+    Rows whose dimension differs from the most recent row's are dropped.
+    """
+    res = await session.execute(
+        select(Article.id, Article.embedding).where(Article.embedding.is_not(None)).order_by(Article.id)
+    )
+    rows = res.all()
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+    decoded = [(r.id, loads_embedding(r.embedding)) for r in rows]
+    dim = len(decoded[-1][1])
+    decoded = [(i, v) for i, v in decoded if len(v) == dim]
+    ids = np.fromiter((i for i, _ in decoded), dtype=np.int64, count=len(decoded))
+    vecs = np.empty((len(decoded), dim), dtype=np.float32)
+    for row, (_, v) in enumerate(decoded):
+        vecs[row] = v
+    return ids, vecs
+
+class EmbeddingStore:
+    """All article embeddings in one contiguous, L2-normalized float32 matrix.
+
+    Rows are appended in place (capacity doubles as needed) and searched with a
+    single matrix-vector product plus ``argpartition`` for the top k.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.dim: Optional[int] = None
+        self._capacity = capacity
+        self._vecs: Optional[np.ndarray] = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._known = set()
+        self.size = 0
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def _reserve(self, extra: int):
+        need = self.size + extra
+        if self._vecs is not None and need <= len(self._vecs):
+            return
+        cap = max(self._capacity, len(self._ids))
+        while cap < need:
+            cap *= 2
+        vecs = np.zeros((cap, self.dim), dtype=np.float32)
+        ids = np.zeros(cap, dtype=np.int64)
+        if self._vecs is not None:
+            vecs[:self.size] = self._vecs[:self.size]
+            ids[:self.size] = self._ids[:self.size]
+        self._vecs, self._ids = vecs, ids
+
+    def add(self, ids: Sequence[int], vecs: Iterable[Sequence[float]]):
+        rows = [(i, np.asarray(v, dtype=np.float32)) for i, v in zip(ids, vecs)
+                if i not in self._known and len(v)]
+        if self.dim is None and rows:
+            self.dim = len(rows[0][1])
+        # Vectors from a different embedder (dim mismatch) can't be compared, so skip them
+        rows = [(i, v) for i, v in rows if len(v) == self.dim]
+        if rows:
+            self.add_matrix(np.array([i for i, _ in rows], dtype=np.int64), np.stack([v for _, v in rows]))
+
+    def add_matrix(self, ids: np.ndarray, block: np.ndarray):
+        """Append an (n, dim) block of new rows; callers guarantee ids are unseen."""
+        if not len(ids):
+            return
+        if self.dim is None:
+            self.dim = block.shape[1]
+        block = block.astype(np.float32, copy=True)
+        block /= np.linalg.norm(block, axis=1, keepdims=True) + 1e-9
+        self._reserve(len(ids))
+        self._vecs[self.size:self.size + len(ids)] = block
+        self._ids[self.size:self.size + len(ids)] = ids
+        self._known.update(ids.tolist())
+        self.size += len(ids)
+
+    async def add_articles(self, arts: Iterable[Article]):
+        # Only track incrementally once loaded; otherwise the first load reads them from the DB
+        if not self.loaded:
+            return
+        arts = [a for a in arts if a.id is not None and a.embedding]
+        self.add([a.id for a in arts], [loads_embedding(a.embedding) for a in arts])
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self.loaded:
+            return
+        # Concurrent first requests (or WARMUP racing one) share a single load
+        async with self._load_lock:
+            if self.loaded:
+                return
+            ids, vecs = await load_embedding_matrix(session)
+            self.add_matrix(ids, vecs)
+            self.loaded = True
+
+    def search(self, query: Sequence[float], k: int = 10,
+               among: Optional[np.ndarray] = None) -> Tuple[List[int], List[float]]:
+        """Ids and cosine similarities of the k rows closest to ``query``, best first,
+        optionally only among the ids in ``among``."""
+        if not self.size or k <= 0:
+            return [], []
+        q = np.asarray(query, dtype=np.float32)
+        if q.shape != (self.dim,):
+            return [], []
+        q = q / (np.linalg.norm(q) + 1e-9)
+        ids, vecs = self._ids[:self.size], self._vecs[:self.size]
+        if among is not None:
+            rows = np.flatnonzero(np.isin(ids, among))
+            ids, vecs = ids[rows], vecs[rows]
+            if not len(ids):
+                return [], []
+        sims = vecs @ q
+        k = min(k, len(ids))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return ids[top].tolist(), sims[top].tolist()
+
+# Process-wide store shared by ingest and recommend_for
+embedding_store = EmbeddingStore()
@@ -1,8 +1,17 @@
-import requests, os, streamlit as st
+import requests, os, time, streamlit as st
 from datetime import datetime, timedelta
 
 API = os.getenv("NEWS_API_URL", "http://127.0.0.1:8008")
 
+def wait_for_job(job_id, timeout=600, every=1.0):
+    """Poll an ingest job until it finishes; returns its final state (or the last one seen)."""
+    deadline = time.time() + timeout
+    while True:
+        job = requests.get(f"{API}/jobs/{job_id}").json()
+        if job.get("status") in ("done", "failed") or time.time() > deadline:
+            return job
+        time.sleep(every)
+
 # Initialize session state
 if 'user_id' not in st.session_state:
     st.session_state.user_id = "alice"
@@ -46,8 +55,10 @@ with col1:
                 with st.spinner("Fetching articles for your interests..."):
                     interests_list = [s.strip() for s in interests.split(",")]
                     r2 = requests.post(f"{API}/ingest-for-interests", json=interests_list)
+                    if r2.status_code == 200:
+                        for job_id in r2.json()["job_ids"]:
+                            wait_for_job(job_id)
                 if r2.status_code == 200:
-                    result = r2.json()
                     st.success(f"✅ Feed updated! New interests: {interests}")
                 else:
                     st.success(f"✅ Feed updated! New interests: {interests}")
@@ -60,8 +71,9 @@ with col2:
     if st.button("🔄 Refresh Today's News", help="Get the latest articles from the past 36 hours"):
         with st.spinner("Fetching today's top stories..."):
             r = requests.post(f"{API}/daily-update")
-            if r.status_code == 200:
-                result = r.json()
+            job = wait_for_job(r.json()["job_id"]) if r.status_code == 200 else {}
+            if job.get("status") == "done":
+                result = job["result"]
                 st.success(f"📰 Added {result['ingested']} fresh articles!")
             else:
                 st.error("Failed to fetch news")
@@ -79,16 +91,11 @@ with col2:
 
 # Load recommendations only if we have articles cached or it's the first load
 if 'current_articles' not in st.session_state or st.session_state.refresh_trigger > 0:
-    import time
-    timestamp = int(time.time() * 1000)  # Current timestamp in milliseconds
-
-    # Load fresh recommendations
+    # Load recommendations (the backend caches them until the profile or corpus changes)
     with st.spinner("Loading personalized recommendations..."):
         r = requests.get(f"{API}/recommendations", params={
             "user_id": st.session_state.user_id, 
             "k": 8,
-            "refresh": st.session_state.refresh_trigger,
-            "timestamp": timestamp
         })
 
     if r.ok:
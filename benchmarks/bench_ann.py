@@ -0,0 +1,58 @@
+"""IVF index recall@k and latency vs. exact search over clustered synthetic embeddings.
+
+    python -m benchmarks.bench_ann --n 200000 --dim 384
+"""
+import argparse, os, tempfile, time
+import numpy as np
+from app.ann_index import IVFIndex
+from app.vector_store import EmbeddingStore
+
+def clustered(n: int, dim: int, topics: int, rng) -> np.ndarray:
+    # Real news embeddings cluster by topic; uniform noise would be an unrealistic worst case
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    return centers[rng.integers(0, topics, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=200_000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--topics", type=int, default=500)
+    ap.add_argument("--nprobe", default="1,4,8,16,32,64")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    vecs = clustered(args.n, args.dim, args.topics, rng)
+    queries = clustered(args.queries, args.dim, args.topics, rng)
+    ids = np.arange(args.n, dtype=np.int64)
+
+    exact = EmbeddingStore()
+    exact.add_matrix(ids, vecs)
+    t0 = time.perf_counter()
+    truth = [set(exact.search(q, k=args.k)[0]) for q in queries]
+    t_exact = (time.perf_counter() - t0) / args.queries
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = IVFIndex(path=os.path.join(tmp, "ann_index.npz"))
+        t0 = time.perf_counter()
+        index.build(ids, vecs)
+        index.compact()
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reloaded = IVFIndex(path=index.path)
+        reloaded.load()
+        t_load = time.perf_counter() - t0
+
+    print(f"articles={args.n} dim={args.dim} k={args.k} nlist={len(index.centroids)}")
+    print(f"build+save {t_build:.2f}s, load {t_load:.2f}s")
+    print(f"exact      : {t_exact * 1000:7.2f} ms/query  recall@{args.k}=1.000")
+    for nprobe in [int(x) for x in args.nprobe.split(",")]:
+        t0 = time.perf_counter()
+        found = [set(reloaded.search(q, k=args.k, nprobe=nprobe)[0]) for q in queries]
+        t = (time.perf_counter() - t0) / args.queries
+        recall = np.mean([len(f & g) / args.k for f, g in zip(found, truth)])
+        print(f"nprobe={nprobe:<4}: {t * 1000:7.2f} ms/query  recall@{args.k}={recall:.3f}")
+
+if __name__ == "__main__":
+    main()
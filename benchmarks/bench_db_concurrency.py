@@ -0,0 +1,107 @@
+"""Reader latency while an ingest writes: recommend_for p50/p99 and lock errors, idle and
+during a stream of write transactions, with WAL on and off.
+
+    python -m benchmarks.bench_db_concurrency --size 20000 --readers 8 --seconds 5
+"""
+import argparse, asyncio, json, os, shutil, subprocess, sys, tempfile, time
+from typing import Dict
+from benchmarks.suite import latency_stats
+
+async def _readers(n: int, users: int, until: float, stop: asyncio.Event) -> Dict:
+    from sqlalchemy.exc import OperationalError
+    from app.db import ReadSessionLocal
+    from app.reco import recommend_for
+    times, errors = [], 0
+
+    async def reader(r: int):
+        nonlocal errors
+        i = r
+        while time.perf_counter() < until and not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                async with ReadSessionLocal() as session:
+                    await recommend_for(session, f"user{i % users}", k=10)
+                times.append(time.perf_counter() - t0)
+            except OperationalError:
+                errors += 1
+            i += n
+
+    await asyncio.gather(*(reader(r) for r in range(n)))
+    return {"errors": errors, "latency": latency_stats(times) if times else None}
+
+async def _writer(batch: int, hold: float, stop: asyncio.Event) -> Dict:
+    """Ingest-shaped writes: insert a batch, keep the transaction open for ``hold`` seconds
+    (summaries/embeddings of the next rows), commit, repeat."""
+    from sqlalchemy import insert
+    from app.db import SessionLocal
+    from app.dates import parse_published_at
+    from app.models import Article
+    from benchmarks.corpus import make_items
+    written, commits, seed = 0, [], 1
+    async with SessionLocal() as session:
+        while not stop.is_set():
+            items = make_items(batch, seed=seed)
+            seed += 1
+            await session.execute(insert(Article), [
+                {"url": it["url"], "title": it["title"], "source": it["source"], "author": it["author"],
+                 "published_at": parse_published_at(it["published_at"]), "description": it["description"],
+                 "content": it["content"]} for it in items])
+            await asyncio.sleep(hold)
+            t0 = time.perf_counter()
+            await session.commit()
+            commits.append(time.perf_counter() - t0)
+            written += batch
+    return {"rows": written, "commit": latency_stats(commits) if commits else None}
+
+def child(args) -> Dict:
+    from benchmarks.corpus import load_db
+    from benchmarks.suite import _add_profiles
+    load_db(args.size)
+    asyncio.run(_add_profiles(args.users))
+
+    async def run():
+        from app.db import ReadSessionLocal
+        from app.reco import recommend_for
+        async with ReadSessionLocal() as session:
+            await recommend_for(session, "user0", k=10)  # first-call costs
+        stop = asyncio.Event()
+        idle = await _readers(args.readers, args.users, time.perf_counter() + args.seconds, stop)
+        writer = asyncio.create_task(_writer(args.batch, args.hold, stop))
+        busy = await _readers(args.readers, args.users, time.perf_counter() + args.seconds, stop)
+        stop.set()
+        return {"idle": idle, "during_write": busy, "writer": await writer}
+
+    return asyncio.run(run())
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=20_000)
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--readers", type=int, default=8)
+    ap.add_argument("--seconds", type=float, default=5)
+    ap.add_argument("--batch", type=int, default=200, help="rows per write transaction")
+    ap.add_argument("--hold", type=float, default=0.05, help="seconds each write transaction stays open")
+    ap.add_argument("--modes", default="wal,delete")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args)))
+        return
+    results = {}
+    for mode in args.modes.split(","):
+        workdir = tempfile.mkdtemp(prefix="news-bench-")
+        env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/news.db",
+               "CACHE_PATH": f"{workdir}/cache.db", "ANN_INDEX_PATH": f"{workdir}/ann_index.npz",
+               "SQLITE_WAL": "1" if mode == "wal" else "0", "OPENAI_API_KEY": ""}
+        try:
+            proc = subprocess.run([sys.executable, "-m", "benchmarks.bench_db_concurrency", "--child", *sys.argv[1:]],
+                                  env=env, capture_output=True, text=True)
+            results[mode] = json.loads(proc.stdout.splitlines()[-1]) if proc.returncode == 0 else \
+                {"error": proc.stderr.strip().splitlines()[-1:]}
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
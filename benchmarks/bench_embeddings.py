@@ -0,0 +1,37 @@
+"""Embedding throughput (texts/s) by batch size, and the per-article loop ingest used to run.
+
+    EMBEDDER=sentence-transformers EMBEDDING_THREADS=4 python -m benchmarks.bench_embeddings --n 512
+"""
+import argparse, time
+from app.embeddings import EMBEDDER, EMBEDDING_MODEL, embed_text, embed_texts
+
+def make_texts(n: int):
+    return [f"Story {i}: officials in city {i % 97} said on Tuesday that the plan for district {i} "
+            f"would move ahead despite concerns raised by residents about cost and timing." for i in range(n)]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=512)
+    ap.add_argument("--batch-sizes", default="1,8,16,32,64,128")
+    args = ap.parse_args()
+
+    texts = make_texts(args.n)
+    t0 = time.perf_counter()
+    embed_texts(texts[:1])  # model load happens here, not in the timings below
+    print(f"embedder={EMBEDDER}" + (f" model={EMBEDDING_MODEL}" if EMBEDDER != "hash" else "")
+          + f" texts={args.n} first call (load): {time.perf_counter() - t0:.2f}s")
+
+    t0 = time.perf_counter()
+    for t in texts:
+        embed_text(t)
+    dt = time.perf_counter() - t0
+    print(f"one at a time   : {args.n / dt:9.1f} texts/s")
+    for bs in [int(x) for x in args.batch_sizes.split(",")]:
+        t0 = time.perf_counter()
+        for start in range(0, args.n, bs):
+            embed_texts(texts[start:start + bs], batch_size=bs)
+        dt = time.perf_counter() - t0
+        print(f"batch_size={bs:<5}: {args.n / dt:9.1f} texts/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Keyword scoring: per-keyword substring scans vs. the single-pass KeywordMatcher.
+
+    python -m benchmarks.bench_keywords --n 100000
+"""
+import argparse, random, time
+from app.keywords import CATEGORY_KEYWORDS, CATEGORY_TRIGGERS, matcher_for
+
+FILLER = ("the of and to in a is that for on was with he as it by at from his an were are which "
+          "this be or had not but what all when can said there use each she how their will up "
+          "other about out many then them these so some would make like him into has look two "
+          "more write go see number no way could people than first water been call who oil its "
+          "now find long down day did get come made may part officials report week city").split()
+
+def make_corpus(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocab = FILLER * 4 + [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    out = []
+    for _ in range(n):
+        title = " ".join(rng.choices(vocab, k=rng.randint(6, 14)))
+        desc = " ".join(rng.choices(vocab, k=rng.randint(15, 35)))
+        content = " ".join(rng.choices(vocab, k=rng.randint(30, 60)))
+        out.append(f"{title} {desc} {content}".lower())
+    return out
+
+def legacy_score(text: str, interests) -> float:
+    # The scan recommend_for used to run: one `in` per interest and per category keyword
+    score = 0.0
+    for interest in interests:
+        if interest in text:
+            score += 3.0
+    for cat, triggers in CATEGORY_TRIGGERS.items():
+        if any(t in interests for t in triggers):
+            for kw in CATEGORY_KEYWORDS[cat]:
+                if kw in text:
+                    score += 2.0
+    return score
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--interests", default="sports,technology,business,health,movie,lakers")
+    args = ap.parse_args()
+
+    interests = [s.strip().lower() for s in args.interests.split(",") if s.strip()]
+    texts = make_corpus(args.n)
+
+    t0 = time.perf_counter()
+    legacy = [legacy_score(t, interests) for t in texts]
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matcher = matcher_for(interests)
+    fast = [matcher.score(t) for t in texts]
+    t_fast = time.perf_counter() - t0
+
+    assert legacy == fast, "scores diverged from the legacy scan"
+    print(f"articles={args.n} interests={interests}")
+    print(f"legacy scan : {t_legacy:.3f}s")
+    print(f"matcher     : {t_fast:.3f}s  ({t_legacy / t_fast:.2f}x)")
+
+if __name__ == "__main__":
+    main()
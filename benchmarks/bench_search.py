@@ -0,0 +1,83 @@
+"""Full-text index vs. scanning: GET /search's FTS5 query against a LIKE scan of the same
+columns, and keyword recommendations with KEYWORD_CANDIDATES=fts against the row scan
+(latency, and how much of the first page the two agree on).
+
+    python -m benchmarks.bench_search --size 100000 --repeats 20
+"""
+import argparse, asyncio, json, os, shutil, tempfile, time
+from typing import Dict, List
+from benchmarks.suite import INTEREST_SETS, latency_stats
+
+QUERIES = ["nba", "lakers playoff", "machine learning", "stock market", "vaccine trial", "golden globe",
+           "quarterly earnings"]
+
+async def _timed(repeats: int, fn) -> List[float]:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        await fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+async def bench_search(repeats: int) -> Dict:
+    from sqlalchemy import or_, select
+    from app.db import ReadSessionLocal
+    from app.models import Article
+    from app.search import search
+    out = {}
+    async with ReadSessionLocal() as session:
+        for q in QUERIES:
+            # Ranking needs every match, so the scan reads all of them
+            like = select(Article.id).where(Article.canonical_url.is_(None), *(
+                or_(*(col.ilike(f"%{w}%") for col in (Article.title, Article.description, Article.content,
+                                                      Article.summary))) for w in q.split()))
+            fts = await _timed(repeats, lambda: search(session, q, limit=20))
+            scan = await _timed(repeats, lambda: session.execute(like))
+            out[q] = {"fts": latency_stats(fts)["p50_ms"], "like_scan": latency_stats(scan)["p50_ms"]}
+    return out
+
+async def bench_recommend(users: int, repeats: int) -> Dict:
+    from app import reco
+    from app.db import ReadSessionLocal
+    out = {}
+    async with ReadSessionLocal() as session:
+        for u in range(min(users, len(INTEREST_SETS))):
+            user, row = f"user{u}", {}
+            pages = {}
+            for mode in ("scan", "fts"):
+                reco.KEYWORD_CANDIDATES = mode
+                await reco.recommend_for(session, user, k=10)  # first-call costs
+                row[mode] = latency_stats(await _timed(repeats, lambda: reco.recommend_for(session, user, k=10)))["p50_ms"]
+                pages[mode] = [a.id for a in await reco.recommend_for(session, user, k=10)]
+            row["first_page_agreement"] = len(set(pages["scan"]) & set(pages["fts"])) / 10
+            out[INTEREST_SETS[u]] = row
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=100_000)
+    ap.add_argument("--spread-hours", type=float, default=72)
+    ap.add_argument("--repeats", type=int, default=20)
+    ap.add_argument("--users", type=int, default=len(INTEREST_SETS))
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="news-bench-")
+    # Before the app is imported: its settings are read at import time
+    os.environ.update(DATABASE_URL=f"sqlite+aiosqlite:///{workdir}/news.db", CACHE_PATH=f"{workdir}/cache.db",
+                      ANN_INDEX_PATH=f"{workdir}/ann_index.npz", OPENAI_API_KEY="")
+    try:
+        from benchmarks.corpus import load_db
+        from benchmarks.suite import _add_profiles
+        load_s = load_db(args.size, spread_hours=args.spread_hours)
+        asyncio.run(_add_profiles(args.users))
+
+        async def run():
+            return {"search": await bench_search(args.repeats),
+                    "recommend_keywords": await bench_recommend(args.users, args.repeats)}
+
+        print(json.dumps({"articles": args.size, "load_s": round(load_s, 2), **asyncio.run(run())}, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Cold-start import cost of the API process, measured with ``python -X importtime``.
+
+Exits non-zero when ``import app.main`` takes longer than the budget or pulls in a
+module that should only load on first use (openai, bs4, requests, torch, ...).
+
+    python -m benchmarks.bench_startup --budget-ms 1500 --runs 5
+"""
+import argparse, re, subprocess, sys
+
+# Imported on the code paths that need them, never at startup
+LAZY_MODULES = ["openai", "httpx", "requests", "bs4", "lxml", "torch", "sentence_transformers"]
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| *(\S+)")
+
+def importtime(module: str):
+    """(total µs, {top-level package: cumulative µs}) for a fresh interpreter importing ``module``."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         capture_output=True, text=True, check=True).stderr
+    total, packages = 0, {}
+    for m in _LINE.finditer(out):
+        cumulative, name = int(m.group(1)), m.group(2)
+        if name == module:
+            total = cumulative
+        top = name.split(".")[0]
+        packages[top] = max(packages.get(top, 0), cumulative)
+    return total, packages
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--module", default="app.main")
+    ap.add_argument("--budget-ms", type=float, default=1500)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    runs = [importtime(args.module) for _ in range(args.runs)]
+    best_total, packages = min(runs, key=lambda r: r[0])
+    print(f"import {args.module}: best {best_total / 1000:.0f} ms over {args.runs} runs "
+          f"(median {sorted(r[0] for r in runs)[len(runs) // 2] / 1000:.0f} ms), budget {args.budget_ms:.0f} ms")
+    for name, us in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<24} {us / 1000:8.1f} ms")
+
+    failures = []
+    if best_total / 1000 > args.budget_ms:
+        failures.append(f"over budget: {best_total / 1000:.0f} ms > {args.budget_ms:.0f} ms")
+    eager = [m for m in LAZY_MODULES if m in packages]
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    for f in failures:
+        print(f"FAIL {f}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
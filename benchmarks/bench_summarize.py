@@ -0,0 +1,65 @@
+"""Ingest summarization against a local chat-completions stub: items go through ingest_items
+(the path production runs) with 1 summary worker vs. several, then the last batch again
+under new URLs to show the summary cache absorbing it.
+
+    python -m benchmarks.bench_summarize --n 100 --latency 0.2 --error-rate 0.05
+"""
+import argparse, asyncio, os, shutil, tempfile, time
+from benchmarks.stubs import chat_completions_stub
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100)
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--error-rate", type=float, default=0.05)
+    ap.add_argument("--workers", default="1,4,8,16", help="INGEST_SUMMARY_WORKERS levels")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="news-bench-")
+    # Before the app is imported: its settings are read at import time. Near-dup detection is
+    # off so the repeated batch reaches the summarizer
+    os.environ.update(DATABASE_URL=f"sqlite+aiosqlite:///{workdir}/news.db", CACHE_PATH=f"{workdir}/cache.db",
+                      ANN_INDEX_PATH=f"{workdir}/ann_index.npz", NEAR_DUP_DETECTION="0")
+
+    def batch(tag, seed):
+        # Unique text per run so the summary cache doesn't hide the concurrency effect
+        from benchmarks.corpus import make_items
+        return [{**it, "url": f"{it['url']}-{tag}", "content": f"Story {seed}-{i}. {it['content']}"}
+                for i, it in enumerate(make_items(args.n, seed=seed))]
+
+    async def run_ingest(items):
+        from sqlalchemy import select
+        from app.db import SessionLocal
+        from app.ingest import ingest_items
+        from app.models import Article
+        async with SessionLocal() as session:
+            await ingest_items(session, items)
+            res = await session.execute(select(Article.summary).where(Article.url.in_([it["url"] for it in items])))
+            return res.scalars().all()
+
+    try:
+        with chat_completions_stub(latency=args.latency, error_rate=args.error_rate) as stub:
+            os.environ["OPENAI_BASE_URL"] = stub.url + "/v1"
+            os.environ["OPENAI_API_KEY"] = "sk-stub"
+            from app import ingest
+            from app.db import init_db
+            from app.summarize import summary_cache
+            asyncio.run(init_db())
+            print(f"texts={args.n} stub latency={args.latency}s error_rate={args.error_rate}")
+            levels = [int(x) for x in args.workers.split(",")]
+            for run, w in enumerate(levels + [levels[-1]]):
+                ingest.INGEST_SUMMARY_WORKERS = w
+                items = batch(run, seed=min(run, len(levels) - 1))
+                calls = stub.calls
+                t0 = time.perf_counter()
+                out = asyncio.run(run_ingest(items))
+                dt = time.perf_counter() - t0
+                llm = sum((s or "").startswith("- ") for s in out)
+                print(f"workers={w:<3}: {dt:6.2f}s  {args.n / dt:8.1f} items/s  "
+                      f"llm={llm} fallback={len(out) - llm} requests={stub.calls - calls}")
+            print(f"cache: {summary_cache.stats()}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Top-k cosine search: EmbeddingStore matrix product vs. the per-pair reco.cosine loop.
+
+    python -m benchmarks.bench_vector_store --n 300000 --dim 384
+"""
+import argparse, time
+import numpy as np
+from app.vector_store import EmbeddingStore
+from app.reco import cosine
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=300_000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--loop-n", type=int, default=20_000, help="corpus size for the slow per-pair baseline")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((args.n, args.dim)).astype(np.float32)
+    store = EmbeddingStore()
+    t0 = time.perf_counter()
+    for start in range(0, args.n, 10_000):  # incremental appends, like repeated ingests
+        store.add(range(start, min(start + 10_000, args.n)), vecs[start:start + 10_000])
+    t_build = time.perf_counter() - t0
+
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    t0 = time.perf_counter()
+    for q in queries:
+        ids, _ = store.search(q, k=args.k)
+    t_search = (time.perf_counter() - t0) / args.queries
+
+    t0 = time.perf_counter()
+    sims = [cosine(queries[0], v) for v in vecs[:args.loop_n]]
+    loop_ids = np.argsort(sims)[::-1][:args.k]
+    t_loop = (time.perf_counter() - t0) * args.n / args.loop_n
+
+    sub = EmbeddingStore()
+    sub.add(range(args.loop_n), vecs[:args.loop_n])
+    assert sub.search(queries[0], k=args.k)[0] == loop_ids.tolist(), "top-k differs from the per-pair loop"
+
+    print(f"articles={args.n} dim={args.dim} k={args.k}")
+    print(f"build (incremental) : {t_build:.3f}s")
+    print(f"store search        : {t_search * 1000:.2f} ms/query")
+    print(f"per-pair cosine loop: {t_loop * 1000:.0f} ms/query (extrapolated from {args.loop_n})")
+
+if __name__ == "__main__":
+    main()
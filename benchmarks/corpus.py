@@ -0,0 +1,104 @@
+"""Synthetic article corpus: fetch_news-shaped items, upstream wire formats, and
+bulk-loaded SQLite databases for the benchmark scenarios.
+
+    DATABASE_URL=sqlite+aiosqlite:////tmp/bench/news.db python -m benchmarks.corpus --n 100000
+"""
+import argparse, asyncio, random, sqlite3, time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from app.keywords import CATEGORY_KEYWORDS
+from benchmarks.bench_keywords import FILLER
+
+CATEGORY_MIX = {"technology": 0.25, "sports": 0.25, "business": 0.2, "entertainment": 0.15, "health": 0.15}
+# (NewsAPI source name, GDELT domain); the names pass fetch_news' source filters
+SOURCES = [("CNN", "cnn.com"), ("Reuters", "reuters.com"), ("BBC News", "bbc.com"),
+           ("Bloomberg", "bloomberg.com"), ("NBC News", "nbcnews.com"), ("Fox News", "foxnews.com")]
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """'sports=3,technology=1' -> {'sports': 3.0, 'technology': 1.0}"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def make_items(n: int, mix: Optional[Dict[str, float]] = None, spread_hours: float = 72, seed: int = 0,
+               now: Optional[datetime] = None) -> List[Dict]:
+    """``n`` articles in the dict shape fetch_news returns, categories drawn from ``mix``
+    and publish times spread uniformly over the last ``spread_hours``."""
+    rng = random.Random(seed)
+    mix = mix or CATEGORY_MIX
+    now = now or datetime.now(timezone.utc)
+    cats = rng.choices(list(mix), weights=list(mix.values()), k=n)
+    out = []
+    for i, cat in enumerate(cats):
+        topic = CATEGORY_KEYWORDS.get(cat, FILLER)
+        words = lambda k: " ".join(rng.choice(topic) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(k))
+        name, domain = rng.choice(SOURCES)
+        published = now - timedelta(hours=rng.uniform(0, spread_hours))
+        out.append({
+            "url": f"https://www.{domain}/{cat}/{seed}-{i}",
+            "title": words(rng.randint(6, 12)).capitalize(),
+            "source": name,
+            "author": f"Reporter {rng.randint(1, 500)}",
+            "published_at": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "description": words(rng.randint(15, 30)),
+            "content": words(rng.randint(30, 60)),
+            "category": cat,
+        })
+    return out
+
+def newsapi_article(it: Dict) -> Dict:
+    return {"source": {"id": None, "name": it["source"]}, "author": it["author"], "title": it["title"],
+            "description": it["description"], "url": it["url"], "publishedAt": it["published_at"],
+            "content": it["content"]}
+
+def gdelt_article(it: Dict) -> Dict:
+    seen = datetime.strptime(it["published_at"], "%Y-%m-%dT%H:%M:%SZ")
+    domain = dict(SOURCES).get(it["source"], "cnn.com")
+    return {"url": it["url"], "title": it["title"], "seendate": seen.strftime("%Y%m%dT%H%M%SZ"),
+            "domain": domain, "language": "English", "snippet": it["content"]}
+
+def load_db(n: int, mix: Optional[Dict[str, float]] = None, spread_hours: float = 72, seed: int = 0,
+            batch_size: int = 10_000) -> float:
+    """Bulk-load ``n`` fully processed articles (summary, embedding, keyword features) into
+    the app's DATABASE_URL, bypassing the ingest pipeline. Returns seconds taken."""
+    from app.db import DATABASE_URL, init_db
+    from app.embeddings import dumps_embedding, embed_texts
+    from app.features import features_for
+    from app.ingest import item_text
+    from app.summarize import extractive_summary
+
+    t0 = time.perf_counter()
+    asyncio.run(init_db())
+    conn = sqlite3.connect(DATABASE_URL.split(":///", 1)[1])
+    cols = ["url", "title", "source", "author", "published_at", "description", "content",
+            "summary", "embedding", "keyword_features", "created_at"]
+    sql = f"INSERT INTO articles ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+    for start in range(0, n, batch_size):
+        items = make_items(min(batch_size, n - start), mix, spread_hours, seed=seed * 1_000_003 + start)
+        vecs = embed_texts([item_text(it) for it in items])
+        rows = []
+        for it, vec in zip(items, vecs):
+            # UTCDateTime's storage format: naive UTC
+            published = datetime.strptime(it["published_at"], "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d %H:%M:%S.%f")
+            rows.append((it["url"], it["title"], it["source"], it["author"], published, it["description"],
+                         it["content"], extractive_summary(it["description"]), dumps_embedding(vec),
+                         features_for(it["title"], it["description"], it["content"]), published))
+        conn.executemany(sql, rows)
+        conn.commit()
+    conn.close()
+    return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=10_000)
+    ap.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in CATEGORY_MIX.items()))
+    ap.add_argument("--spread-hours", type=float, default=72)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    dt = load_db(args.n, parse_mix(args.mix), args.spread_hours, args.seed)
+    print(f"loaded {args.n} articles in {dt:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Local HTTP stand-ins for the upstream APIs, for benchmarks and manual testing.
+
+Each server runs on a daemon thread on 127.0.0.1 and adds a configurable
+latency per request, so concurrency effects show up without network access.
+"""
+import itertools, json, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delay(self):
+        time.sleep(self.server.latency)
+
+class _ChatHandler(_Handler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self._delay()
+        self.server.calls += 1
+        if random.random() < self.server.error_rate:
+            self._send(503, {"error": {"message": "stub overloaded", "type": "server_error"}})
+            return
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        text = prompt.split("\n\n", 1)[-1]
+        content = "- " + " ".join(text.split()[:12])
+        self._send(200, {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 12, "total_tokens": len(prompt.split()) + 12},
+        })
+
+class _NewsHandler(_Handler):
+    """NewsAPI top-headlines and the GDELT doc API, serving fresh synthetic articles on every call."""
+
+    def do_GET(self):
+        from benchmarks.corpus import gdelt_article, make_items, newsapi_article
+        url = urlsplit(self.path)
+        q = dict(parse_qsl(url.query))
+        self._delay()
+        self.server.calls += 1
+        if random.random() < self.server.error_rate:
+            self._send(503, {"status": "error", "code": "unexpectedError", "message": "stub overloaded"})
+            return
+        seed = next(self.server.seeds)
+        if url.path.endswith("/top-headlines"):
+            cat = q.get("category")
+            items = make_items(int(q.get("pageSize", 20)), {cat: 1} if cat else None, seed=seed)
+            self._send(200, {"status": "ok", "totalResults": len(items), "articles": [newsapi_article(it) for it in items]})
+        elif url.path.endswith("/doc/doc"):
+            topic = q.get("query", "").split()[0] if q.get("query") else None
+            items = make_items(int(q.get("maxrecords", 50)), {topic: 1} if topic else None, seed=seed)
+            self._send(200, {"articles": [gdelt_article(it) for it in items]})
+        else:
+            self._send(404, {"status": "error", "message": f"no stub for {url.path}"})
+
+class StubServer:
+    """Context manager running one stub handler; ``url`` is its base URL."""
+
+    def __init__(self, handler=_ChatHandler, latency: float = 0.2, error_rate: float = 0.0):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._server.latency = latency
+        self._server.error_rate = error_rate
+        self._server.calls = 0
+        self._server.seeds = itertools.count(10**9)  # clear of the seeds corpus.load_db uses
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def calls(self) -> int:
+        return self._server.calls
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+def chat_completions_stub(latency: float = 0.2, error_rate: float = 0.0) -> StubServer:
+    """Mimics POST /v1/chat/completions; point OPENAI_BASE_URL at ``url + '/v1'``."""
+    return StubServer(_ChatHandler, latency, error_rate)
+
+def news_stub(latency: float = 0.2, error_rate: float = 0.0) -> StubServer:
+    """Mimics NewsAPI and GDELT; point NEWSAPI_URL at ``url + '/v2/top-headlines'`` and
+    GDELT_URL at ``url + '/api/v2/doc/doc'`` (any NEWSAPI_KEY is accepted)."""
+    return StubServer(_NewsHandler, latency, error_rate)
@@ -0,0 +1,256 @@
+"""Benchmark suite: timed scenarios against throwaway databases, results as JSON.
+
+    python -m benchmarks.suite --out results.json
+    python -m benchmarks.suite --scenarios recommend --sizes 1000,100000,1000000
+    python -m benchmarks.suite --compare before.json after.json
+
+Scenarios, each run in its own process with a fresh DATABASE_URL/CACHE_PATH:
+  recommend     recommend_for latency per rank_by at every --sizes corpus size
+  daily-update  complete POST /daily-update jobs against the local NewsAPI/GDELT stub
+  load          GET /recommendations p50/p99 over HTTP with --concurrency clients
+  batch         users/s of recommend_batch vs one recommend_for call per user (--batch-users)
+"""
+import argparse, json, os, platform, random, shutil, socket, subprocess, sys, tempfile, threading, time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+SCENARIOS = ["recommend", "daily-update", "load", "batch"]
+INTEREST_SETS = ["sports,technology", "business,finance", "health,science", "movie,music",
+                 "nba,lakers", "ai,startup", "football,soccer", "economy,market"]
+
+def latency_stats(seconds: List[float]) -> Dict[str, float]:
+    import numpy as np
+    ms = np.asarray(seconds) * 1000
+    return {"n": len(ms), "mean_ms": round(float(ms.mean()), 3), "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p90_ms": round(float(np.percentile(ms, 90)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "max_ms": round(float(ms.max()), 3)}
+
+async def _add_profiles(users: int):
+    from app.db import SessionLocal
+    from app.models import UserProfile
+    async with SessionLocal() as session:
+        session.add_all(UserProfile(user_id=f"user{i}", interests=INTEREST_SETS[i % len(INTEREST_SETS)])
+                        for i in range(users))
+        await session.commit()
+
+# --- scenarios (run in the child process) -----------------------------------
+
+def scenario_recommend(args) -> Dict:
+    import asyncio
+    from benchmarks.corpus import load_db
+    load_s = load_db(args.size, spread_hours=args.spread_hours)
+
+    async def run():
+        from app.db import SessionLocal
+        from app.reco import recommend_for
+        await _add_profiles(args.users)
+        out = {}
+        for rank_by in ("keywords", "embedding"):
+            times = []
+            for i in range(args.repeats + 1):
+                t0 = time.perf_counter()
+                async with SessionLocal() as session:
+                    await recommend_for(session, f"user{i % args.users}", k=10, rank_by=rank_by)
+                times.append(time.perf_counter() - t0)
+            # The first call also loads the embedding index, so it is reported on its own
+            out[rank_by] = {"first_ms": round(times[0] * 1000, 3), **latency_stats(times[1:])}
+        return out
+
+    return {"articles": args.size, "load_s": round(load_s, 2), **asyncio.run(run())}
+
+def scenario_daily_update(args) -> Dict:
+    from benchmarks.stubs import news_stub
+    with news_stub(latency=args.upstream_latency) as stub:
+        os.environ.update(NEWSAPI_URL=stub.url + "/v2/top-headlines", GDELT_URL=stub.url + "/api/v2/doc/doc",
+                          NEWSAPI_KEY="bench")
+        from fastapi.testclient import TestClient
+        from app.main import app
+        walls, inserted = [], []
+        with TestClient(app) as client:
+            for _ in range(args.repeats):
+                t0 = time.perf_counter()
+                job_id = client.post("/daily-update").json()["job_id"]
+                while (job := client.get(f"/jobs/{job_id}").json())["status"] not in ("done", "failed"):
+                    time.sleep(0.01)
+                walls.append(time.perf_counter() - t0)
+                inserted.append(job["result"]["ingested"] if job["status"] == "done" else None)
+        return {"upstream_latency_s": args.upstream_latency, "upstream_requests": stub.calls,
+                "inserted_per_run": inserted, "wall": latency_stats(walls)}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def scenario_load(args) -> Dict:
+    import asyncio, httpx, uvicorn
+    from benchmarks.corpus import load_db
+    load_db(args.size, spread_hours=args.spread_hours)
+    asyncio.run(_add_profiles(args.users))
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    async def drive():
+        rng = random.Random(0)
+        remaining = iter(range(args.requests))
+        times, errors = [], 0
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            await client.get("/recommendations", params={"user_id": "user0"})  # first-request costs
+
+            async def worker():
+                nonlocal errors
+                for _ in remaining:
+                    t0 = time.perf_counter()
+                    r = await client.get("/recommendations", params={"user_id": f"user{rng.randrange(args.users)}", "k": 10})
+                    times.append(time.perf_counter() - t0)
+                    errors += r.status_code != 200
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            wall = time.perf_counter() - t0
+            cache = (await client.get("/cache-stats")).json().get("recommendations")
+        return {"articles": args.size, "users": args.users, "concurrency": args.concurrency,
+                "requests": args.requests, "errors": errors, "rps": round(args.requests / wall, 1),
+                "latency": latency_stats(times), "result_cache": cache}
+
+    try:
+        return asyncio.run(drive())
+    finally:
+        server.should_exit = True
+        thread.join()
+
+def scenario_batch(args) -> Dict:
+    import asyncio
+    from benchmarks.corpus import load_db
+    load_db(args.size, spread_hours=args.spread_hours)
+    asyncio.run(_add_profiles(args.batch_users))
+
+    async def run():
+        from app.db import ReadSessionLocal
+        from app.reco import recommend_batch, recommend_for
+        users = [f"user{i}" for i in range(args.batch_users)]
+        out = {}
+        for rank_by in ("keywords", "embedding"):
+            async with ReadSessionLocal() as session:
+                await recommend_for(session, "user0", k=10, rank_by=rank_by)  # first-call costs
+                t0 = time.perf_counter()
+                for user in users:
+                    await recommend_for(session, user, k=10, rank_by=rank_by)
+                single = time.perf_counter() - t0
+                t0 = time.perf_counter()
+                async for _ in recommend_batch(session, users, k=10, rank_by=rank_by):
+                    pass
+                batch = time.perf_counter() - t0
+            out[rank_by] = {"single_users_per_s": round(len(users) / single, 1),
+                            "batch_users_per_s": round(len(users) / batch, 1)}
+        return out
+
+    return {"articles": args.size, "users": args.batch_users, **asyncio.run(run())}
+
+SCENARIO_FNS = {"recommend": scenario_recommend, "daily-update": scenario_daily_update, "load": scenario_load,
+                "batch": scenario_batch}
+
+# --- driver -------------------------------------------------------------------
+
+def _run_child(scenario: str, args, size: int = 0) -> Dict:
+    workdir = tempfile.mkdtemp(prefix="news-bench-")
+    result_file = os.path.join(workdir, "result.json")
+    env = {**os.environ,
+           "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/news.db", "CACHE_PATH": f"{workdir}/cache.db",
+           "ANN_INDEX_PATH": f"{workdir}/ann_index.npz", "INGEST_SCHEDULER": "0", "WARMUP": "0",
+           # Empty (not unset) so a local .env can't switch summaries to the real API
+           "OPENAI_API_KEY": ""}
+    cmd = [sys.executable, "-m", "benchmarks.suite", "--child", scenario, "--result-file", result_file,
+           "--size", str(size), *sys.argv[1:]]
+    try:
+        proc = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL if not args.verbose else None)
+        if proc.returncode != 0 or not os.path.exists(result_file):
+            return {"error": f"exit status {proc.returncode}"}
+        with open(result_file) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def _meta(args) -> Dict:
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True).stdout.strip()
+        except Exception:
+            return None
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("child", "result_file", "size", "out", "compare")}}
+
+def _leaves(d, prefix=""):
+    for k, v in d.items():
+        if isinstance(v, dict):
+            yield from _leaves(v, f"{prefix}{k}.")
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            yield f"{prefix}{k}", v
+
+def compare(old_path: str, new_path: str):
+    """Print every numeric result present in both runs with its new/old ratio."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    before = dict(_leaves(old["results"]))
+    for key, value in _leaves(new["results"]):
+        if key in before and before[key]:
+            print(f"  {key:<60} {before[key]:>12} -> {value:>12}  ({value / before[key]:.2f}x)")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--sizes", default="1000,100000", help="corpus sizes for 'recommend' (add 1000000 for the full run)")
+    ap.add_argument("--spread-hours", type=float, default=72, help="publish times spread over this many hours")
+    ap.add_argument("--repeats", type=int, default=20)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--load-size", type=int, default=10_000, help="corpus size for 'load'")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--batch-users", type=int, default=2000, help="users per run of 'batch'")
+    ap.add_argument("--upstream-latency", type=float, default=0.2, help="stub NewsAPI/GDELT latency (s)")
+    ap.add_argument("--out", help="write the JSON here instead of stdout")
+    ap.add_argument("--verbose", action="store_true", help="show the app's output")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--result-file", help=argparse.SUPPRESS)
+    ap.add_argument("--size", type=int, default=0, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.child:
+        if args.child in ("load", "batch"):
+            args.size = args.load_size
+        result = SCENARIO_FNS[args.child](args)
+        with open(args.result_file, "w") as f:
+            json.dump(result, f)
+        return
+
+    results = {}
+    for scenario in args.scenarios.split(","):
+        if scenario == "recommend":
+            results[scenario] = {str(n): _run_child(scenario, args, n) for n in map(int, args.sizes.split(","))}
+        else:
+            results[scenario] = _run_child(scenario, args)
+        print(f"{scenario}: done", file=sys.stderr)
+    report = json.dumps({"meta": _meta(args), "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os, tempfile
+
+# Before any app module is imported: settings are read at import time
+_workdir = tempfile.mkdtemp(prefix="news-test-")
+os.environ.update(DATABASE_URL=f"sqlite+aiosqlite:///{_workdir}/news.db", CACHE_PATH=f"{_workdir}/cache.db",
+                  ANN_INDEX_PATH=f"{_workdir}/ann_index.npz", FEATURE_STORE_PATH=f"{_workdir}/feature_store.bin",
+                  OPENAI_API_KEY="")
@@ -0,0 +1,31 @@
+import asyncio
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from app import main
+from app.db import ReadSessionLocal, SessionLocal
+from app.feeds import rebuild_feed
+from app.jobs import job_queue
+from app.models import UserFeed
+
+async def _feeds() -> int:
+    async with ReadSessionLocal() as session:
+        return await session.scalar(select(func.count()).select_from(UserFeed))
+
+def test_unknown_user_queues_no_rebuild(monkeypatch):
+    monkeypatch.setattr(main, "MATERIALIZED", True)
+    submitted = []
+    monkeypatch.setattr(job_queue, "submit", lambda key, fn: submitted.append(key))
+    with TestClient(main.app) as client:
+        for i in range(5):
+            r = client.get("/recommendations", params={"user_id": f"nobody-{i}"})
+            assert r.status_code == 200
+    assert submitted == []
+    assert asyncio.run(_feeds()) == 0
+
+def test_rebuild_without_profile_writes_nothing():
+    async def run():
+        async with SessionLocal() as session:
+            return await rebuild_feed(session, "nobody")
+    with TestClient(main.app):  # creates the tables
+        assert asyncio.run(run()) == 0
+    assert asyncio.run(_feeds()) == 0
@@ -0,0 +1,21 @@
+from app.near_dup import NearDupIndex, simhash
+
+TITLE = "Stocks rise as Fed holds rates steady"
+DESCRIPTION = "Investors cheered the decision on Wednesday"
+
+def test_syndicated_copy_matches():
+    index = NearDupIndex()
+    index.add(simhash(TITLE, DESCRIPTION), "https://apnews.com/stocks")
+    assert index.match(simhash(TITLE, DESCRIPTION)) == "https://apnews.com/stocks"
+
+def test_headlines_one_word_apart_are_different_stories():
+    index = NearDupIndex()
+    index.add(simhash(TITLE, DESCRIPTION), "https://apnews.com/stocks-rise")
+    assert index.match(simhash(TITLE.replace("rise", "fall"), DESCRIPTION)) is None
+
+def test_removed_story_no_longer_matches():
+    index = NearDupIndex()
+    h = simhash(TITLE, DESCRIPTION)
+    index.add(h, "https://apnews.com/stocks")
+    index.remove(h, "https://apnews.com/stocks")
+    assert index.match(h) is None and index.size == 0